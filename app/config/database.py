@@ -1,3 +1,4 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 import os
@@ -7,11 +8,47 @@ DATABASE_URL = os.getenv(
     "sqlite+aiosqlite:///./store_monitoring.db"
 )
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# "development" keeps statement echo and SQLite defaults; "production" turns echo off
+# and tunes SQLite so report reads are not blocked behind ingestion writes
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+
+ENGINE_PROFILES = {
+    "development": {
+        "echo": True,
+        "sqlite_pragmas": {},
+    },
+    "production": {
+        "echo": False,
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+            # Negative values are KiB rather than pages
+            "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024))),
+            "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000")),
+        },
+    },
+}
+
+if DB_PROFILE not in ENGINE_PROFILES:
+    raise ValueError(f"Unknown DB_PROFILE {DB_PROFILE!r}, expected one of {sorted(ENGINE_PROFILES)}")
+
+engine_profile = ENGINE_PROFILES[DB_PROFILE]
+
+engine = create_async_engine(DATABASE_URL, echo=engine_profile["echo"])
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+if engine.dialect.name == "sqlite" and engine_profile["sqlite_pragmas"]:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        # Runs for every new pooled connection; most pragmas are per-connection
+        cursor = dbapi_connection.cursor()
+        for name, value in engine_profile["sqlite_pragmas"].items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 class Base(DeclarativeBase):
     pass
 
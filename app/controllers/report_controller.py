@@ -6,14 +6,17 @@ from typing import Dict
 from app.services.report_service import ReportService
 
 router = APIRouter()
+MEDIA_TYPES = {".csv": "text/csv", ".parquet": "application/vnd.apache.parquet"}
 report_service = ReportService()
 
 @router.post("/trigger_report")
-async def trigger_report() -> Dict[str, str]:
+async def trigger_report(format: str = "csv") -> Dict[str, str]:
    
     try:
-        report_id = await report_service.trigger_report()
+        report_id = await report_service.trigger_report(format)
         return {"report_id": report_id}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to trigger report: {str(e)}")
 
@@ -28,10 +31,11 @@ async def get_report(report_id: str):
         if result["status"] == "Complete":
             file_path = result["file_path"]
             if os.path.exists(file_path):
+                extension = os.path.splitext(file_path)[1]
                 return FileResponse(
                     path=file_path,
-                    filename=f"store_report_{report_id}.csv",
-                    media_type="text/csv"
+                    filename=f"store_report_{report_id}{extension}",
+                    media_type=MEDIA_TYPES.get(extension, "application/octet-stream")
                 )
             else:
                 raise HTTPException(status_code=404, detail="Report file not found")
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import Dict, Any
+import pytz
+
+from app.controllers.report_controller import report_service
+
+router = APIRouter()
+# Shared with reports: one store config cache, index cache and worker pool per process
+uptime_service = report_service.uptime_service
+
+@router.get("/uptime")
+async def get_uptime(store_id: str, start: datetime, end: datetime, local: bool = False) -> Dict[str, Any]:
+    """Uptime and downtime of one store between two ISO 8601 timestamps.
+
+    Timestamps without an offset are UTC, or the store's local time when
+    ``local`` is set.
+    """
+    try:
+        store_key = await uptime_service.stores.get_key(store_id)
+        if store_key is None:
+            raise HTTPException(status_code=404, detail=f"Unknown store {store_id}")
+        
+        if local:
+            store_tz = await uptime_service.get_store_timezone(store_key)
+            start, end = (_to_utc(value, store_tz) for value in (start, end))
+        else:
+            start, end = (_to_utc(value, pytz.UTC) for value in (start, end))
+        
+        if start >= end:
+            raise HTTPException(status_code=400, detail="start must be before end")
+        
+        metrics = await uptime_service.calculate_range_metrics(store_key, start, end)
+        
+        return {
+            "store_id": store_id,
+            "start": metrics.start_time.isoformat(),
+            "end": metrics.end_time.isoformat(),
+            "business_hours": metrics.business_hours,
+            "uptime_hours": metrics.uptime_hours,
+            "downtime_hours": metrics.downtime_hours
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to calculate uptime: {str(e)}")
+
+def _to_utc(value: datetime, naive_tz) -> datetime:
+    """Naive UTC datetime, reading naive input in ``naive_tz``"""
+    if value.tzinfo is None:
+        value = naive_tz.localize(value)
+    return value.astimezone(pytz.UTC).replace(tzinfo=None)
@@ -6,6 +6,7 @@ from contextlib import asynccontextmanager
 
 from app.config.database import init_db
 from app.controllers.report_controller import router as report_router
+from app.controllers.uptime_controller import router as uptime_router
 from app.services.data_ingestion_service import DataIngestionService
 
 @asynccontextmanager
@@ -33,6 +34,7 @@ app = FastAPI(
 )
 
 app.include_router(report_router, prefix="/api/v1")
+app.include_router(uptime_router, prefix="/api/v1")
 
 @app.get("/health")
 async def health_check():
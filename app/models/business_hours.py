@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Time, Integer, DateTime
+from sqlalchemy import Column, ForeignKey, Time, Integer, DateTime
 from sqlalchemy.sql import func
 from app.config.database import Base
 from datetime import datetime, time
@@ -7,10 +7,11 @@ class BusinessHours(Base):
     __tablename__ = "business_hours"
 
     id = Column(Integer, primary_key=True, index=True)
-    store_id = Column(String, nullable=False, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False, index=True)
     day_of_week = Column(Integer, nullable=False)  
     start_time_local = Column(Time, nullable=False)
     end_time_local = Column(Time, nullable=False)
+    generation = Column(Integer, nullable=False, default=0, index=True)
     created_at = Column(DateTime, default=func.now())
 
     def __repr__(self):
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+class DataGeneration(Base):
+    """Visibility window of a versioned table.
+
+    Rows whose ``generation`` lies in [base_generation, live_generation] are
+    the published data. Ingestion stages rows under a higher generation and
+    publishes them by moving this pointer in a single transaction.
+    """
+    __tablename__ = "data_generation"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String, nullable=False, unique=True, index=True)
+    base_generation = Column(Integer, nullable=False, default=0)
+    live_generation = Column(Integer, nullable=False, default=0)
+    max_timestamp_utc = Column(DateTime, nullable=True)  # newest observation in the window, for tables that have one
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DataGeneration(table={self.table_name}, base={self.base_generation}, live={self.live_generation})>"
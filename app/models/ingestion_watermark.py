@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+class IngestionWatermark(Base):
+    __tablename__ = "ingestion_watermark"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False, unique=True, index=True)
+    byte_offset = Column(Integer, nullable=False)  # end of the last fully ingested line
+    row_count = Column(Integer, nullable=False)  # data rows before byte_offset, for quarantine line numbers
+    max_timestamp_utc = Column(DateTime, nullable=True)
+    fingerprint = Column(String, nullable=False)  # sampled hash of the bytes before byte_offset
+    file_size = Column(Integer, nullable=False)
+    file_mtime = Column(Float, nullable=False)
+    content_hash = Column(String, nullable=False)  # CsvReader.content_hash of the first file_size bytes, extended on appends
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IngestionWatermark(source={self.source}, offset={self.byte_offset}, max_timestamp={self.max_timestamp_utc})>"
@@ -14,7 +14,7 @@ class Report(Base):
     id = Column(Integer, primary_key=True, index=True)
     report_id = Column(String, nullable=False, unique=True, index=True)
     status = Column(String, nullable=False, default=ReportStatus.RUNNING)
-    file_path = Column(String, nullable=True)
+    file_path = Column(String, nullable=True, index=True)
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer
+from app.config.database import Base
+
+class Store(Base):
+    """Maps external store IDs to the dense integer keys used by every fact table"""
+    __tablename__ = "stores"
+
+    id = Column(Integer, primary_key=True)
+    external_id = Column(String, nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<Store(id={self.id}, external_id={self.external_id})>"
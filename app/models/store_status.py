@@ -1,16 +1,18 @@
-from sqlalchemy import Column, String, DateTime, Integer
-from sqlalchemy.sql import func
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, Index
 from app.config.database import Base
-from datetime import datetime
 
 class StoreStatus(Base):
     __tablename__ = "store_status"
+    __table_args__ = (
+        # Per-store observation windows are a single range scan in timestamp order
+        Index("ix_store_status_store_timestamp", "store_id", "timestamp_utc"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    store_id = Column(String, nullable=False, index=True)
-    timestamp_utc = Column(DateTime, nullable=False, index=True)
-    status = Column(String, nullable=False)  
-    created_at = Column(DateTime, default=func.now())
+    id = Column(Integer, primary_key=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    timestamp_utc = Column(Integer, nullable=False)  # epoch seconds
+    is_active = Column(Boolean, nullable=False)
+    generation = Column(Integer, nullable=False, default=0, index=True)
 
     def __repr__(self):
-        return f"<StoreStatus(store_id={self.store_id}, timestamp={self.timestamp_utc}, status={self.status})>"
+        return f"<StoreStatus(store_id={self.store_id}, timestamp={self.timestamp_utc}, active={self.is_active})>"
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy import Column, ForeignKey, String, Integer, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from app.config.database import Base
 
 class StoreTimezone(Base):
     __tablename__ = "store_timezone"
+    __table_args__ = (
+        UniqueConstraint("generation", "store_id", name="uq_store_timezone_generation_store"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    store_id = Column(String, nullable=False, unique=True, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False, index=True)
     timezone_str = Column(String, nullable=False)
+    generation = Column(Integer, nullable=False, default=0, index=True)
     created_at = Column(DateTime, default=func.now())
 
     def __repr__(self):
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, Index
+from app.config.database import Base
+
+class UptimeRollup(Base):
+    """Interpolated uptime of one business interval (at most one per store and local day).
+
+    An interval's uptime only depends on the observations inside it, so a
+    window's uptime is the sum of the intervals it contains plus the two it
+    cuts through, which are recomputed from raw observations.
+    """
+    __tablename__ = "uptime_rollup"
+    __table_args__ = (
+        Index("ix_uptime_rollup_store_interval", "store_id", "interval_start"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    interval_start = Column(Integer, nullable=False)  # epoch seconds
+    interval_end = Column(Integer, nullable=False)  # epoch seconds
+    business_seconds = Column(Integer, nullable=False)
+    active_seconds = Column(Float, nullable=False)
+    observation_count = Column(Integer, nullable=False)
+    generation = Column(Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return (f"<UptimeRollup(store_id={self.store_id}, interval_start={self.interval_start}, "
+                f"active_seconds={self.active_seconds})>")
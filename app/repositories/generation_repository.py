@@ -0,0 +1,109 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.models.data_generation import DataGeneration
+from sqlalchemy import delete, select
+from sqlalchemy.orm import aliased
+
+@dataclass(frozen=True)
+class GenerationWindow:
+    base: int = 0
+    live: int = 0
+    # Recorded at publish, so readers never scan the window for it
+    max_timestamp: Optional[datetime] = None
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Published generation windows of every versioned table, read once per report"""
+    windows: Dict[str, GenerationWindow] = field(default_factory=dict)
+
+    def window(self, model) -> GenerationWindow:
+        return self.windows.get(model.__tablename__, GenerationWindow())
+
+    def visible(self, model):
+        window = self.window(model)
+        return model.generation.between(window.base, window.live)
+
+    def with_staged(self, model, generation: int, replace: bool) -> "DataSnapshot":
+        """This snapshot as it will look once a staged generation is published"""
+        window = self.window(model)
+        staged = GenerationWindow(generation if replace else window.base, generation)
+        return DataSnapshot({**self.windows, model.__tablename__: staged})
+
+    @property
+    def key(self) -> Tuple[Tuple[str, int, int], ...]:
+        return tuple(sorted((name, w.base, w.live) for name, w in self.windows.items()))
+
+class GenerationRepository:
+
+    async def get_snapshot(self, session) -> DataSnapshot:
+        result = await session.execute(select(DataGeneration))
+        return DataSnapshot({
+            row.table_name: GenerationWindow(row.base_generation, row.live_generation, row.max_timestamp_utc)
+            for row in result.scalars().all()
+        })
+
+    async def get_window(self, session, model) -> GenerationWindow:
+        pointer = await self._get_pointer(session, model)
+        if pointer is None:
+            return GenerationWindow()
+        return GenerationWindow(pointer.base_generation, pointer.live_generation, pointer.max_timestamp_utc)
+
+    async def begin_staging(self, session, model, key_columns: Sequence[str] = ()) -> int:
+        """Drop leftovers of earlier loads and return the generation to stage new rows under.
+
+        Rows above the live generation belong to a load that never published;
+        rows below the base generation were superseded by the previous full
+        reload and are kept until now so reports that started before that swap
+        could finish reading them.
+
+        With ``key_columns``, an appended generation may re-publish rows under
+        the same key. Older published copies of such rows are dropped here too,
+        for the same reason only once the next load starts.
+        """
+        window = await self.get_window(session, model)
+        await session.execute(delete(model).where(
+            (model.generation > window.live) | (model.generation < window.base)
+        ))
+        
+        if key_columns:
+            newer = aliased(model)
+            superseded = select(newer.id).where(
+                *(getattr(newer, column) == getattr(model, column) for column in key_columns),
+                newer.generation > model.generation,
+                newer.generation <= window.live
+            ).exists()
+            await session.execute(delete(model).where(superseded))
+        
+        await session.commit()
+        return window.live + 1
+
+    async def publish(
+        self,
+        session,
+        model,
+        generation: int,
+        replace: bool,
+        max_timestamp: Optional[datetime] = None
+    ):
+        """Make a staged generation visible; the caller commits.
+
+        ``replace`` hides every earlier generation (full reload), otherwise the
+        staged rows are appended to the current window. ``max_timestamp`` is the
+        newest observation of the whole window once published.
+        """
+        pointer = await self._get_pointer(session, model)
+        if pointer is None:
+            pointer = DataGeneration(table_name=model.__tablename__, base_generation=generation)
+            session.add(pointer)
+        
+        if replace:
+            pointer.base_generation = generation
+        pointer.live_generation = generation
+        pointer.max_timestamp_utc = max_timestamp
+
+    async def _get_pointer(self, session, model) -> DataGeneration:
+        stmt = select(DataGeneration).where(DataGeneration.table_name == model.__tablename__)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
@@ -0,0 +1,88 @@
+import asyncio
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Dict, Optional, Tuple
+
+import pytz
+
+from app.models.business_hours import BusinessHours
+from app.models.store_timezone import StoreTimezone
+from app.repositories.generation_repository import DataSnapshot, GenerationWindow
+from app.services.business_calendar import ALWAYS_OPEN, HoursKey, hours_key
+from sqlalchemy import select
+
+# Stores missing from the timezone data are assumed to be in this zone
+DEFAULT_TIMEZONE = "America/Chicago"
+
+@dataclass(frozen=True)
+class StoreConfig:
+    """Timezone and business-hours schedule of every store for one config generation"""
+    key: Tuple[GenerationWindow, GenerationWindow]
+    default_timezone: pytz.BaseTzInfo
+    timezones: Dict[int, pytz.BaseTzInfo] = field(default_factory=dict)
+    hours: Dict[int, HoursKey] = field(default_factory=dict)
+
+    def timezone(self, store_id: int) -> pytz.BaseTzInfo:
+        return self.timezones.get(store_id, self.default_timezone)
+
+    def business_hours(self, store_id: int) -> HoursKey:
+        """Stores without hours share the single 24/7 schedule"""
+        return self.hours.get(store_id, ALWAYS_OPEN)
+
+class StoreConfigCache:
+    """Keeps store timezones and hours in memory until ingestion publishes new ones.
+
+    Both tables are loaded with one query each. The cached config is reused
+    for as long as their published generation windows are unchanged, and
+    timezone objects are interned so stores in the same zone share one.
+    """
+
+    def __init__(self, default_timezone: str = DEFAULT_TIMEZONE):
+        self._zones: Dict[str, pytz.BaseTzInfo] = {}
+        self._default_timezone = self._zone(default_timezone)
+        self._config: Optional[StoreConfig] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, session, snapshot: DataSnapshot) -> StoreConfig:
+        key = (snapshot.window(StoreTimezone), snapshot.window(BusinessHours))
+        
+        config = self._config
+        if config is not None and config.key == key:
+            return config
+        
+        async with self._lock:
+            if self._config is None or self._config.key != key:
+                self._config = StoreConfig(
+                    key=key,
+                    default_timezone=self._default_timezone,
+                    timezones=await self._load_timezones(session, snapshot),
+                    hours=await self._load_business_hours(session, snapshot)
+                )
+                print(f"Loaded config for {len(self._config.hours)} stores with business hours "
+                      f"and {len(self._config.timezones)} with a timezone")
+            return self._config
+
+    async def _load_timezones(self, session, snapshot: DataSnapshot) -> Dict[int, pytz.BaseTzInfo]:
+        stmt = select(StoreTimezone.store_id, StoreTimezone.timezone_str).where(
+            snapshot.visible(StoreTimezone)
+        )
+        result = await session.execute(stmt)
+        return {store_id: self._zone(timezone_str) for store_id, timezone_str in result.all()}
+
+    async def _load_business_hours(self, session, snapshot: DataSnapshot) -> Dict[int, HoursKey]:
+        stmt = select(
+            BusinessHours.store_id,
+            BusinessHours.day_of_week,
+            BusinessHours.start_time_local,
+            BusinessHours.end_time_local
+        ).where(snapshot.visible(BusinessHours)).order_by(BusinessHours.store_id, BusinessHours.id)
+        result = await session.execute(stmt)
+        return {
+            store_id: hours_key(rows)
+            for store_id, rows in groupby(result.all(), key=lambda row: row.store_id)
+        }
+
+    def _zone(self, timezone_str: str) -> pytz.BaseTzInfo:
+        if timezone_str not in self._zones:
+            self._zones[timezone_str] = pytz.timezone(timezone_str)
+        return self._zones[timezone_str]
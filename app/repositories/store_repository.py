@@ -0,0 +1,53 @@
+import asyncio
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.config.database import AsyncSessionLocal
+from app.models.store import Store
+from sqlalchemy import insert, select
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lookups
+LOOKUP_BATCH_SIZE = 500
+
+class StoreRepository:
+    """Assigns and caches integer surrogate keys for external store IDs.
+
+    Keys are assigned in a dedicated, immediately committed session under a
+    lock, so loaders running concurrently never race on the same new store.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def assign_keys(self, external_ids: pd.Series) -> pd.Series:
+        """Map a column of external store IDs to integer keys, creating missing stores"""
+        unknown = [store_id for store_id in pd.unique(external_ids) if store_id not in self._keys]
+        
+        if unknown:
+            async with self._lock:
+                async with AsyncSessionLocal() as session:
+                    await self._load_keys(session, unknown)
+                    
+                    new_ids = [store_id for store_id in unknown if store_id not in self._keys]
+                    if new_ids:
+                        await session.execute(insert(Store), [{'external_id': store_id} for store_id in new_ids])
+                        await session.commit()
+                        await self._load_keys(session, new_ids)
+        
+        return external_ids.map(self._keys).astype('int64')
+
+    async def get_key(self, external_id: str) -> Optional[int]:
+        """Integer key of an existing store, or None if it has never been ingested"""
+        if external_id not in self._keys:
+            async with AsyncSessionLocal() as session:
+                await self._load_keys(session, [external_id])
+        return self._keys.get(external_id)
+
+    async def _load_keys(self, session, external_ids: List[str]):
+        for i in range(0, len(external_ids), LOOKUP_BATCH_SIZE):
+            batch = external_ids[i:i + LOOKUP_BATCH_SIZE]
+            stmt = select(Store.external_id, Store.id).where(Store.external_id.in_(batch))
+            result = await session.execute(stmt)
+            self._keys.update(dict(result.all()))
@@ -0,0 +1,120 @@
+"""Compile a store's weekly business hours into sorted UTC epoch intervals.
+
+Every local date contributes at most one interval: that weekday's hours,
+cut at the next local midnight (overnight shifts end there, as they always
+have in the uptime calculation). Local midnights and opening times are
+localized per date, so DST transitions move the UTC boundaries correctly.
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pytz
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+# ((day_of_week, start_time_local, end_time_local), ...) - hashable so compiled weeks can be cached
+HoursKey = Tuple[Tuple[int, time, time], ...]
+
+# Stores without business hours are treated as open around the clock
+ALWAYS_OPEN: HoursKey = tuple((day, time(0, 0, 0), time(23, 59, 59)) for day in range(7))
+
+def hours_key(business_hours: Iterable) -> HoursKey:
+    """First row per weekday wins, matching the original per-day lookup"""
+    by_day: Dict[int, Tuple[time, time]] = {}
+    for bh in business_hours:
+        by_day.setdefault(bh.day_of_week, (bh.start_time_local, bh.end_time_local))
+    return tuple((day, start, end) for day, (start, end) in sorted(by_day.items()))
+
+def compile_calendar(
+    hours: HoursKey,
+    timezone_str: str,
+    start_epoch: int,
+    end_epoch: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted, disjoint [start, end] business intervals clipped to [start_epoch, end_epoch]"""
+    # A local date's interval starts no earlier than its local midnight, which is
+    # at most a day (plus DST slack) before any instant on that date
+    first_week = (start_epoch - 2 * 24 * 3600) // WEEK_SECONDS
+    last_week = end_epoch // WEEK_SECONDS
+    
+    weeks = [_compile_week(hours, timezone_str, week) for week in range(first_week, last_week + 1)]
+    starts = np.concatenate([week[0] for week in weeks])
+    ends = np.concatenate([week[1] for week in weeks])
+    
+    starts = np.maximum(starts, start_epoch)
+    ends = np.minimum(ends, end_epoch)
+    keep = starts < ends
+    return starts[keep], ends[keep]
+
+@lru_cache(maxsize=100_000)
+def _compile_week(hours: HoursKey, timezone_str: str, week: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Intervals of every local date whose midnight falls in the given UTC epoch week"""
+    hours_by_day = {day: (start, end) for day, start, end in hours}
+    store_tz = None
+    
+    starts = []
+    ends = []
+    
+    for local_date, day_start, next_day_start, steady in _week_frame(timezone_str, week):
+        day_hours = hours_by_day.get(local_date.weekday())
+        if not day_hours:
+            continue
+        
+        start_time, end_time = day_hours
+        if steady:
+            # No UTC offset change on this date: opening times are plain offsets from midnight
+            opens = day_start + _seconds(start_time)
+            closes = day_start + _seconds(end_time)
+        else:
+            store_tz = store_tz or pytz.timezone(timezone_str)
+            opens = _local_epoch(store_tz, local_date, start_time)
+            closes = _local_epoch(store_tz, local_date, end_time)
+        
+        interval_start = max(opens, day_start)
+        # Overnight hours (end <= start) run until midnight of this local date
+        interval_end = next_day_start if end_time <= start_time else min(closes, next_day_start)
+        
+        if interval_start < interval_end:
+            starts.append(interval_start)
+            ends.append(interval_end)
+    
+    compiled = (np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64))
+    for array in compiled:
+        array.flags.writeable = False
+    return compiled
+
+@lru_cache(maxsize=10_000)
+def _week_frame(timezone_str: str, week: int) -> Tuple[Tuple[date, int, int, bool], ...]:
+    """(local date, midnight, next midnight, offset unchanged) for local midnights in the week.
+
+    Shared by every store in the timezone, so each zone localizes its
+    midnights once per week however many schedules are compiled against it.
+    """
+    store_tz = pytz.timezone(timezone_str)
+    week_start = week * WEEK_SECONDS
+    week_end = week_start + WEEK_SECONDS
+    
+    current_date = datetime.fromtimestamp(week_start, pytz.UTC).astimezone(store_tz).date()
+    day_start = _local_epoch(store_tz, current_date, time.min)
+    if day_start < week_start:
+        current_date += timedelta(days=1)
+        day_start = _local_epoch(store_tz, current_date, time.min)
+    
+    frame = []
+    while day_start < week_end:
+        next_date = current_date + timedelta(days=1)
+        next_day_start = _local_epoch(store_tz, next_date, time.min)
+        frame.append((current_date, day_start, next_day_start, next_day_start - day_start == 24 * 3600))
+        current_date = next_date
+        day_start = next_day_start
+    
+    return tuple(frame)
+
+def _seconds(local_time: time) -> int:
+    return local_time.hour * 3600 + local_time.minute * 60 + local_time.second
+
+def _local_epoch(store_tz, local_date: date, local_time: time) -> int:
+    localized = store_tz.localize(datetime.combine(local_date, local_time))
+    return int(localized.timestamp())
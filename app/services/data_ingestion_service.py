@@ -1,20 +1,86 @@
+import numpy as np
 import pandas as pd
 import asyncio
+import functools
+from dataclasses import dataclass
 from datetime import datetime, time
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple
 import pytz
 import os
+import time as timer
 
 from app.config.database import AsyncSessionLocal
 from app.models.store_status import StoreStatus
 from app.models.business_hours import BusinessHours
 from app.models.store_timezone import StoreTimezone
+from app.models.ingestion_watermark import IngestionWatermark
+from app.models.uptime_rollup import UptimeRollup
+from app.repositories.generation_repository import DataSnapshot, GenerationRepository
+from app.repositories.store_config_repository import DEFAULT_TIMEZONE, StoreConfig, StoreConfigCache
+from app.repositories.store_repository import StoreRepository
+from app.services import uptime_rollup
+from app.services.observations import Observations
+from app.utils.cpu_executor import run_cpu_bound
 from app.utils.csv_reader import CsvReader
-from sqlalchemy import text
+from app.utils.epoch import from_epoch, series_to_epoch
+from sqlalchemy import Table, func, insert, select
+
+VALID_STATUSES = ('active', 'inactive')
+
+# Everything is read as text and typed by the vectorized parse stage, so a
+# malformed value is quarantined instead of failing the whole chunk
+STORE_STATUS_COLUMNS = {'store_id': str, 'status': str, 'timestamp_utc': str}
+BUSINESS_HOURS_COLUMNS = {'store_id': str, 'dayOfWeek': str, 'start_time_local': str, 'end_time_local': str}
+TIMEZONE_COLUMNS = {'store_id': str, 'timezone_str': str}
+
+# Reports look back one week from the newest observation, so the rollup always covers at least that
+ROLLUP_HORIZON_SECONDS = 7 * 24 * 3600
+ROLLUP_STORE_BATCH = 500
+
+class _RowCounter:
+    """Wraps a chunk parse stage and remembers how many CSV data rows it has seen"""
+    
+    def __init__(self, parse, first_row: int = 0):
+        self.parse = parse
+        self.rows_read = first_row
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        # A header-only file still yields one empty chunk
+        if len(chunk):
+            self.rows_read = int(chunk.index[-1]) + 1
+        return self.parse(chunk)
+
+@dataclass
+class StagedLoad:
+    """Rows of one source written under an unpublished generation, plus its next watermark"""
+    source: str
+    model: Any
+    generation: int
+    replace: bool
+    loaded_rows: int
+    file_stat: os.stat_result
+    byte_offset: int
+    row_count: int
+    fingerprint: str
+    content_hash: str
+    max_timestamp: Optional[datetime] = None
+
+@dataclass
+class StagedRollup:
+    """Uptime rollup rows written under an unpublished generation"""
+    generation: int
+    replace: bool
+    loaded_rows: int
 
 class DataIngestionService:
-    def __init__(self):
+    def __init__(self, chunk_size: int = 50000, incremental: bool = True):
         self.csv_reader = CsvReader()
+        self.chunk_size = chunk_size
+        self.incremental = incremental
+        self.generations = GenerationRepository()
+        self.stores = StoreRepository()
+        self.store_configs = StoreConfigCache()
+        self.quarantine_dir = os.path.join("data", "quarantine")
 
     async def load_all_data(self):
         print("Starting data ingestion...")
@@ -22,113 +88,591 @@ class DataIngestionService:
         from app.config.database import init_db
         await init_db()
         
-        await self.load_store_status_data()
-        await self.load_business_hours_data()
-        await self.load_timezone_data()
+        started = timer.perf_counter()
+        
+        # The sources are independent: each one streams into its own session and
+        # they only meet again when their generations are published together
+        results = await asyncio.gather(
+            self._stage_store_status_data(),
+            self._stage_business_hours_data(),
+            self._stage_timezone_data(),
+            return_exceptions=True
+        )
+        
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
         
-        print("Data ingestion completed!")
+        await self._publish([result for result in results if result is not None])
+        
+        print(f"Data ingestion completed in {timer.perf_counter() - started:.2f}s!")
 
     async def load_store_status_data(self):
+        await self._publish([await self._stage_store_status_data()])
+
+    async def load_business_hours_data(self):
+        await self._publish([await self._stage_business_hours_data()])
+
+    async def load_timezone_data(self):
+        await self._publish([await self._stage_timezone_data()])
+
+    async def _publish(self, staged_loads: List[Optional[StagedLoad]]):
+        """Swap every staged generation and the rollup built from them in, with the watermarks, in one transaction"""
+        staged_loads = [staged for staged in staged_loads if staged is not None]
+        rollup = await self._stage_uptime_rollup(staged_loads)
+        if not staged_loads and rollup is None:
+            return
+        
+        async with AsyncSessionLocal() as session:
+            for staged in staged_loads:
+                await self.generations.publish(
+                    session, staged.model, staged.generation,
+                    replace=staged.replace, max_timestamp=staged.max_timestamp
+                )
+                await self._save_watermark(session, staged)
+            if rollup is not None:
+                await self.generations.publish(session, UptimeRollup, rollup.generation, replace=rollup.replace)
+            await session.commit()
+        
+        for staged in staged_loads:
+            print(f"Published {staged.loaded_rows} {staged.source} rows as generation {staged.generation}")
+        if rollup is not None:
+            print(f"Published {rollup.loaded_rows} uptime rollup rows as generation {rollup.generation}")
+
+    async def _stage_uptime_rollup(self, staged_loads: List[StagedLoad]) -> Optional[StagedRollup]:
+        """Roll up uptime per business interval for the data about to be published.
+
+        Config changes, full status reloads and a missing rollup rebuild it.
+        Appended observations only recompute the intervals from the earliest
+        new observation, or the previous newest one, onwards.
+        """
+        async with AsyncSessionLocal() as session:
+            published = await self.generations.get_snapshot(session)
+            snapshot = published
+            for staged in staged_loads:
+                snapshot = snapshot.with_staged(staged.model, staged.generation, staged.replace)
+            
+            rebuild = published.window(UptimeRollup).live == 0 or any(staged.replace for staged in staged_loads)
+            appended = [staged for staged in staged_loads if staged.model is StoreStatus and not staged.replace]
+            if not rebuild and not appended:
+                return None
+            
+            first_timestamp, last_timestamp = await self._observation_bounds(session, snapshot)
+            if last_timestamp is None:
+                return None
+            
+            coverage_start = min(first_timestamp, last_timestamp - ROLLUP_HORIZON_SECONDS)
+            stores = await self._observed_stores(session, snapshot)
+            
+            if rebuild:
+                range_starts = {store_id: coverage_start for store_id in stores}
+            else:
+                # New observations change the intervals they land in, and a later newest
+                # observation brings new intervals into range for every store
+                new_first, _ = await self._observation_bounds(session, snapshot, appended[0].generation)
+                _, old_last = await self._observation_bounds(session, published)
+                range_start = min(value for value in (new_first, old_last) if value is not None)
+                
+                rolled_up = set(await self._observed_stores(session, published, UptimeRollup))
+                range_starts = {
+                    store_id: range_start if store_id in rolled_up else coverage_start
+                    for store_id in stores
+                }
+            
+            store_config = await self.store_configs.get(session, snapshot)
+            # Appends re-publish the intervals they touch; the copies they replaced are dropped here
+            generation = await self.generations.begin_staging(
+                session, UptimeRollup, key_columns=("store_id", "interval_start")
+            )
+            
+            started = timer.perf_counter()
+            loaded_rows = 0
+            
+            for i in range(0, len(stores), ROLLUP_STORE_BATCH):
+                batch = stores[i:i + ROLLUP_STORE_BATCH]
+                lower = min(range_starts[store_id] for store_id in batch) - uptime_rollup.MAX_INTERVAL_SECONDS
+                observations = await self._get_observations(session, snapshot, batch, lower)
+                
+                columns = await run_cpu_bound(
+                    self._rollup_stores, batch, range_starts, last_timestamp, observations, store_config
+                )
+                loaded_rows += await self._bulk_insert(session, UptimeRollup.__table__, generation, columns)
+                await session.commit()
+            
+            self._report_throughput("uptime rollup", loaded_rows, started)
+            return StagedRollup(generation=generation, replace=rebuild, loaded_rows=loaded_rows)
+
+    async def _observation_bounds(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        generation: Optional[int] = None
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """First and last visible observation time, optionally within one generation"""
+        stmt = select(func.min(StoreStatus.timestamp_utc), func.max(StoreStatus.timestamp_utc)).where(
+            snapshot.visible(StoreStatus)
+        )
+        if generation is not None:
+            stmt = stmt.where(StoreStatus.generation == generation)
+        result = await session.execute(stmt)
+        return tuple(result.one())
+
+    async def _observed_stores(self, session, snapshot: DataSnapshot, model=StoreStatus) -> List[int]:
+        stmt = select(model.store_id).where(snapshot.visible(model)).distinct().order_by(model.store_id)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def _get_observations(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        store_ids: List[int],
+        since: int
+    ) -> Observations:
+        """Observations of the given stores, sorted by store, then timestamp"""
+        stmt = select(
+            StoreStatus.store_id,
+            StoreStatus.timestamp_utc,
+            StoreStatus.is_active
+        ).where(
+            StoreStatus.store_id.in_(store_ids),
+            StoreStatus.timestamp_utc >= since,
+            snapshot.visible(StoreStatus)
+        ).order_by(StoreStatus.store_id, StoreStatus.timestamp_utc)
+        result = await session.execute(stmt)
+        return Observations.from_rows(result.all())
+
+    def _rollup_stores(
+        self,
+        store_ids: List[int],
+        range_starts: Dict[int, int],
+        range_end: int,
+        observations: Observations,
+        store_config: StoreConfig
+    ) -> Dict[str, List[Any]]:
+        """Rollup row columns for a batch of stores; runs on the CPU executor"""
+        run_starts, run_ends = observations.runs(store_ids)
+        
+        parts = []
+        for store_id, run_start, run_end in zip(store_ids, run_starts.tolist(), run_ends.tolist()):
+            starts, ends, active, counts = uptime_rollup.rollup_store(
+                observations.times[run_start:run_end],
+                observations.active[run_start:run_end],
+                store_config.business_hours(store_id),
+                store_config.timezone(store_id).zone,
+                range_starts[store_id],
+                range_end
+            )
+            parts.append((np.full(len(starts), store_id, dtype=np.int64), starts, ends, active, counts))
+        
+        store_keys, starts, ends, active, counts = (np.concatenate(column) for column in zip(*parts))
+        return {
+            'store_id': store_keys.tolist(),
+            'interval_start': starts.tolist(),
+            'interval_end': ends.tolist(),
+            'business_seconds': (ends - starts).tolist(),
+            'active_seconds': active.tolist(),
+            'observation_count': counts.tolist()
+        }
+
+    async def _stage_store_status_data(self) -> Optional[StagedLoad]:
+        file_path = "data/store_status.csv"
         try:
-            df = await self.csv_reader.read_csv("data/store_status.csv")
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"CSV file not found: {file_path}")
+            
+            file_stat = os.stat(file_path)
+            end_offset = self.csv_reader.complete_lines_end(file_path)
             
             async with AsyncSessionLocal() as session:
-                try:
-                    await session.execute(text("DELETE FROM store_status"))
-                except Exception:
-                    pass  
+                watermark = await self._get_watermark(session, "store_status")
+                if await self._is_unchanged(session, file_path, file_stat, watermark):
+                    print("store_status.csv is unchanged since the last ingestion, skipping it")
+                    return None
                 
-                batch_size = 1000
-                total_rows = len(df)
+                start_offset, first_row = self._resume_point(file_path, file_stat, watermark)
                 
-                for i in range(0, total_rows, batch_size):
-                    batch = df.iloc[i:i + batch_size]
-                    status_objects = []
-                    
-                    for _, row in batch.iterrows():
-                        timestamp_utc = pd.to_datetime(row['timestamp_utc'])
-                        
-                        status_obj = StoreStatus(
-                            store_id=str(row['store_id']),
-                            timestamp_utc=timestamp_utc,
-                            status=row['status']
-                        )
-                        status_objects.append(status_obj)
-                    
-                    session.add_all(status_objects)
+                if start_offset == end_offset:
+                    print("No new store status records since the last ingestion")
+                    return None
+                
+                # Rows are staged under a new generation that readers cannot see
+                # until it is published together with the watermark
+                generation = await self.generations.begin_staging(session, StoreStatus)
+                replace = start_offset == 0
+                
+                if replace:
+                    self._reset_quarantine("store_status")
+                    max_timestamp = None
+                else:
+                    print(f"Appending store status records after byte {start_offset}")
+                    max_timestamp = watermark.max_timestamp_utc
+                
+                started = timer.perf_counter()
+                loaded_rows = 0
+                parse = _RowCounter(self._parse_store_status, first_row)
+                
+                async for parsed in self.csv_reader.iter_csv_chunks(
+                    file_path,
+                    chunksize=self.chunk_size,
+                    dtype=STORE_STATUS_COLUMNS,
+                    usecols=list(STORE_STATUS_COLUMNS),
+                    transform=parse,
+                    byte_range=(start_offset, end_offset),
+                    first_row=first_row
+                ):
+                    store_keys = await self.stores.assign_keys(parsed['store_id'])
+                    loaded_rows += await self._bulk_insert(session, StoreStatus.__table__, generation, {
+                        'store_id': store_keys.tolist(),
+                        'timestamp_utc': parsed['timestamp_utc'].tolist(),
+                        'is_active': parsed['is_active'].tolist()
+                    })
+                    if not parsed.empty:
+                        chunk_max = from_epoch(int(parsed['timestamp_utc'].max()))
+                        max_timestamp = chunk_max if max_timestamp is None else max(max_timestamp, chunk_max)
                     await session.commit()
                     
-                    print(f"Loaded {min(i + batch_size, total_rows)} / {total_rows} store status records")
+                    print(f"Loaded {loaded_rows} store status records")
+                
+                self._report_throughput("store status", loaded_rows, started)
+                
+                return await self._staged_load(
+                    "store_status", StoreStatus, generation, replace, loaded_rows,
+                    file_path, file_stat, end_offset, parse.rows_read, max_timestamp, watermark
+                )
                 
         except Exception as e:
             print(f"Error loading store status data: {e}")
             raise
 
-    async def load_business_hours_data(self):
+    async def _stage_business_hours_data(self) -> Optional[StagedLoad]:
+        file_path = "data/menu_hours.csv"
         try:
-            if not os.path.exists("data/menu_hours.csv"):
+            if not os.path.exists(file_path):
                 print("Business hours file not found, stores will be assumed 24/7")
-                return
+                return None
 
-            df = await self.csv_reader.read_csv("data/menu_hours.csv")
+            file_stat = os.stat(file_path)
+            end_offset = self.csv_reader.complete_lines_end(file_path)
+            if end_offset == 0:
+                print("menu_hours.csv has no complete lines, skipping it")
+                return None
             
             async with AsyncSessionLocal() as session:
-                try:
-                    await session.execute(text("DELETE FROM business_hours"))
-                except Exception:
-                    pass  
+                watermark = await self._get_watermark(session, "business_hours")
+                if await self._is_unchanged(session, file_path, file_stat, watermark):
+                    print("menu_hours.csv is unchanged since the last ingestion, skipping it")
+                    return None
                 
-                business_hours_objects = []
+                self._reset_quarantine("business_hours")
+                generation = await self.generations.begin_staging(session, BusinessHours)
                 
-                for _, row in df.iterrows():
-                    start_time = datetime.strptime(row['start_time_local'], '%H:%M:%S').time()
-                    end_time = datetime.strptime(row['end_time_local'], '%H:%M:%S').time()
-                    
-                    business_hours_obj = BusinessHours(
-                        store_id=str(row['store_id']),
-                        day_of_week=int(row['dayOfWeek']),
-                        start_time_local=start_time,
-                        end_time_local=end_time
-                    )
-                    business_hours_objects.append(business_hours_obj)
-                
-                session.add_all(business_hours_objects)
-                await session.commit()
+                started = timer.perf_counter()
+                loaded_rows = 0
+                parse = _RowCounter(self._parse_business_hours)
+                
+                async for parsed in self.csv_reader.iter_csv_chunks(
+                    file_path,
+                    chunksize=self.chunk_size,
+                    dtype=BUSINESS_HOURS_COLUMNS,
+                    usecols=list(BUSINESS_HOURS_COLUMNS),
+                    transform=parse,
+                    byte_range=(0, end_offset)
+                ):
+                    store_keys = await self.stores.assign_keys(parsed['store_id'])
+                    loaded_rows += await self._bulk_insert(session, BusinessHours.__table__, generation, {
+                        'store_id': store_keys.tolist(),
+                        'day_of_week': parsed['day_of_week'].tolist(),
+                        'start_time_local': parsed['start_time_local'].tolist(),
+                        'end_time_local': parsed['end_time_local'].tolist()
+                    })
+                    await session.commit()
+                
+                print(f"Loaded {loaded_rows} business hours records")
+                self._report_throughput("business hours", loaded_rows, started)
                 
-                print(f"Loaded {len(business_hours_objects)} business hours records")
+                return await self._staged_load(
+                    "business_hours", BusinessHours, generation, True, loaded_rows,
+                    file_path, file_stat, end_offset, parse.rows_read
+                )
                 
         except Exception as e:
             print(f"Error loading business hours data: {e}")
             raise
 
-    async def load_timezone_data(self):
+    async def _stage_timezone_data(self) -> Optional[StagedLoad]:
+        file_path = "data/timezones.csv"
         try:
-            if not os.path.exists("data/timezones.csv"):
-                print("Timezone file not found, stores will use America/Chicago")
-                return
+            if not os.path.exists(file_path):
+                print(f"Timezone file not found, stores will use {DEFAULT_TIMEZONE}")
+                return None
 
-            df = await self.csv_reader.read_csv("data/timezones.csv")
+            file_stat = os.stat(file_path)
+            end_offset = self.csv_reader.complete_lines_end(file_path)
+            if end_offset == 0:
+                print("timezones.csv has no complete lines, skipping it")
+                return None
             
             async with AsyncSessionLocal() as session:
-                try:
-                    await session.execute(text("DELETE FROM store_timezone"))
-                except Exception:
-                    pass  
+                watermark = await self._get_watermark(session, "store_timezone")
+                if await self._is_unchanged(session, file_path, file_stat, watermark):
+                    print("timezones.csv is unchanged since the last ingestion, skipping it")
+                    return None
                 
-                timezone_objects = []
+                self._reset_quarantine("store_timezone")
+                generation = await self.generations.begin_staging(session, StoreTimezone)
                 
-                for _, row in df.iterrows():
-                    timezone_obj = StoreTimezone(
-                        store_id=str(row['store_id']),
-                        timezone_str=row['timezone_str']
-                    )
-                    timezone_objects.append(timezone_obj)
+                started = timer.perf_counter()
+                loaded_rows = 0
+                # A store may have only one timezone, so the IDs seen so far span every chunk
+                parse = _RowCounter(functools.partial(self._parse_timezones, seen_store_ids=set()))
                 
-                session.add_all(timezone_objects)
-                await session.commit()
+                async for parsed in self.csv_reader.iter_csv_chunks(
+                    file_path,
+                    chunksize=self.chunk_size,
+                    dtype=TIMEZONE_COLUMNS,
+                    usecols=list(TIMEZONE_COLUMNS),
+                    transform=parse,
+                    byte_range=(0, end_offset)
+                ):
+                    store_keys = await self.stores.assign_keys(parsed['store_id'])
+                    loaded_rows += await self._bulk_insert(session, StoreTimezone.__table__, generation, {
+                        'store_id': store_keys.tolist(),
+                        'timezone_str': parsed['timezone_str'].tolist()
+                    })
+                    await session.commit()
+                
+                print(f"Loaded {loaded_rows} timezone records")
+                self._report_throughput("timezone", loaded_rows, started)
                 
-                print(f"Loaded {len(timezone_objects)} timezone records")
+                return await self._staged_load(
+                    "store_timezone", StoreTimezone, generation, True, loaded_rows,
+                    file_path, file_stat, end_offset, parse.rows_read
+                )
                 
         except Exception as e:
             print(f"Error loading timezone data: {e}")
             raise
+
+    async def _staged_load(
+        self,
+        source: str,
+        model,
+        generation: int,
+        replace: bool,
+        loaded_rows: int,
+        file_path: str,
+        file_stat: os.stat_result,
+        byte_offset: int,
+        row_count: int,
+        max_timestamp: Optional[datetime] = None,
+        watermark: Optional[IngestionWatermark] = None
+    ) -> StagedLoad:
+        # Hash what was stat'ed before reading, so rows appended meanwhile count as a change next time
+        loop = asyncio.get_event_loop()
+        if not replace and watermark.file_size <= file_stat.st_size:
+            # An append costs time proportional to the new rows: only the bytes past the old size are hashed
+            content_hash = await loop.run_in_executor(
+                None, self.csv_reader.extend_content_hash,
+                file_path, watermark.content_hash, watermark.file_size, file_stat.st_size
+            )
+        else:
+            content_hash = await loop.run_in_executor(
+                None, self.csv_reader.content_hash, file_path, file_stat.st_size
+            )
+        
+        return StagedLoad(
+            source=source,
+            model=model,
+            generation=generation,
+            replace=replace,
+            loaded_rows=loaded_rows,
+            file_stat=file_stat,
+            byte_offset=byte_offset,
+            row_count=row_count,
+            fingerprint=self.csv_reader.fingerprint(file_path, byte_offset),
+            content_hash=content_hash,
+            max_timestamp=max_timestamp
+        )
+
+    async def _get_watermark(self, session, source: str) -> Optional[IngestionWatermark]:
+        stmt = select(IngestionWatermark).where(IngestionWatermark.source == source)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    def _resume_point(
+        self,
+        file_path: str,
+        file_stat: os.stat_result,
+        watermark: Optional[IngestionWatermark]
+    ) -> Tuple[int, int]:
+        """Return the (byte offset, row number) to resume from; (0, 0) means a full reload.
+
+        Only called once ``_is_unchanged`` has said the file changed.
+        """
+        if not self.incremental or watermark is None:
+            return 0, 0
+        
+        if file_stat.st_size < watermark.byte_offset:
+            print(f"{file_path} shrank since the last ingestion, reloading it from scratch")
+            return 0, 0
+        
+        # Changed without growing, so nothing was appended
+        if file_stat.st_size == watermark.file_size:
+            print(f"{file_path} was rewritten in place since the last ingestion, reloading it from scratch")
+            return 0, 0
+        
+        if self.csv_reader.fingerprint(file_path, watermark.byte_offset) != watermark.fingerprint:
+            print(f"{file_path} was rewritten since the last ingestion, reloading it from scratch")
+            return 0, 0
+        
+        return watermark.byte_offset, watermark.row_count
+
+    async def _is_unchanged(
+        self,
+        session,
+        file_path: str,
+        file_stat: os.stat_result,
+        watermark: Optional[IngestionWatermark]
+    ) -> bool:
+        """True when the file still has the size, mtime or content it was last ingested with"""
+        if not self.incremental or watermark is None:
+            return False
+        
+        if watermark.file_size != file_stat.st_size:
+            return False
+        
+        if watermark.file_mtime == file_stat.st_mtime:
+            return True
+        
+        # Same size but touched: only the full content tells a touch from an in-place rewrite
+        loop = asyncio.get_event_loop()
+        content_hash = await loop.run_in_executor(
+            None, self.csv_reader.content_hash, file_path, file_stat.st_size
+        )
+        if content_hash != watermark.content_hash:
+            return False
+        
+        watermark.file_mtime = file_stat.st_mtime
+        await session.commit()
+        return True
+
+    async def _save_watermark(self, session, staged: "StagedLoad"):
+        watermark = await self._get_watermark(session, staged.source)
+        if watermark is None:
+            watermark = IngestionWatermark(source=staged.source)
+            session.add(watermark)
+        
+        watermark.byte_offset = staged.byte_offset
+        watermark.row_count = staged.row_count
+        watermark.max_timestamp_utc = staged.max_timestamp
+        watermark.fingerprint = staged.fingerprint
+        watermark.file_size = staged.file_stat.st_size
+        watermark.file_mtime = staged.file_stat.st_mtime
+        watermark.content_hash = staged.content_hash
+
+    def _parse_store_status(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        timestamps = self.csv_reader.parse_utc_timestamps(chunk['timestamp_utc'])
+        
+        reasons = pd.Series(None, index=chunk.index, dtype=object)
+        self._reject(reasons, chunk['store_id'].isna(), "missing store_id")
+        self._reject(reasons, timestamps.isna(), "invalid timestamp_utc")
+        self._reject(reasons, ~chunk['status'].isin(VALID_STATUSES), "invalid status")
+        valid = self._quarantine("store_status", chunk, reasons)
+        
+        return pd.DataFrame({
+            'store_id': chunk['store_id'][valid].astype(str),
+            'timestamp_utc': series_to_epoch(timestamps[valid]),
+            'is_active': chunk['status'][valid] == 'active'
+        })
+
+    def _parse_business_hours(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        day_of_week = pd.to_numeric(chunk['dayOfWeek'], errors='coerce')
+        start_times = self.csv_reader.parse_times(chunk['start_time_local'])
+        end_times = self.csv_reader.parse_times(chunk['end_time_local'])
+        
+        reasons = pd.Series(None, index=chunk.index, dtype=object)
+        self._reject(reasons, chunk['store_id'].isna(), "missing store_id")
+        self._reject(reasons, ~day_of_week.isin(range(7)), "invalid dayOfWeek")
+        self._reject(reasons, start_times.isna(), "invalid start_time_local")
+        self._reject(reasons, end_times.isna(), "invalid end_time_local")
+        valid = self._quarantine("business_hours", chunk, reasons)
+        
+        return pd.DataFrame({
+            'store_id': chunk['store_id'][valid].astype(str),
+            'day_of_week': day_of_week[valid].astype(int),
+            'start_time_local': start_times[valid],
+            'end_time_local': end_times[valid]
+        })
+
+    def _parse_timezones(self, chunk: pd.DataFrame, seen_store_ids: Set[str]) -> pd.DataFrame:
+        """Typed timezone rows; only the first valid row of each store is kept"""
+        reasons = pd.Series(None, index=chunk.index, dtype=object)
+        self._reject(reasons, chunk['store_id'].isna(), "missing store_id")
+        self._reject(reasons, ~chunk['timezone_str'].isin(pytz.all_timezones_set), "unknown timezone_str")
+        
+        # Duplicates would violate the (generation, store_id) constraint and fail the whole load
+        candidates = chunk['store_id'].where(reasons.isna())
+        duplicates = reasons.isna() & (candidates.duplicated() | candidates.isin(seen_store_ids))
+        self._reject(reasons, duplicates, "duplicate store_id")
+        valid = self._quarantine("store_timezone", chunk, reasons)
+        seen_store_ids.update(chunk['store_id'][valid])
+        
+        return pd.DataFrame({
+            'store_id': chunk['store_id'][valid].astype(str),
+            'timezone_str': chunk['timezone_str'][valid]
+        })
+
+    def _reject(self, reasons: pd.Series, mask: pd.Series, reason: str):
+        """Record a rejection reason for masked rows, keeping the first reason per row"""
+        reasons[mask & reasons.isna()] = reason
+
+    def _quarantine_path(self, source: str) -> str:
+        return os.path.join(self.quarantine_dir, f"{source}_rejected.csv")
+
+    def _reset_quarantine(self, source: str):
+        path = self._quarantine_path(source)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _quarantine(self, source: str, chunk: pd.DataFrame, reasons: pd.Series) -> pd.Series:
+        """Append rejected rows with their CSV line numbers and return the mask of valid rows"""
+        rejected = reasons.notna()
+        
+        if rejected.any():
+            path = self._quarantine_path(source)
+            os.makedirs(self.quarantine_dir, exist_ok=True)
+            
+            bad_rows = chunk[rejected].copy()
+            # Line 1 is the header, so data row N sits on line N + 2
+            bad_rows.insert(0, 'reason', reasons[rejected])
+            bad_rows.insert(0, 'row_number', bad_rows.index + 2)
+            bad_rows.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+            
+            print(f"Quarantined {int(rejected.sum())} invalid {source} rows to {path}")
+        
+        return ~rejected
+
+    async def _bulk_insert(
+        self,
+        session,
+        table: Table,
+        generation: int,
+        columns: Dict[str, List[Any]]
+    ) -> int:
+        """Insert equal-length column arrays under one generation with a single Core executemany"""
+        names = list(columns.keys())
+        records = [
+            dict(zip(names, values), generation=generation)
+            for values in zip(*columns.values())
+        ]
+        
+        if records:
+            await session.execute(insert(table), records)
+        
+        return len(records)
+
+    def _report_throughput(self, label: str, row_count: int, started: float):
+        elapsed = timer.perf_counter() - started
+        rate = row_count / elapsed if elapsed > 0 else float(row_count)
+        print(f"Inserted {row_count} {label} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
@@ -0,0 +1,47 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+class Observations:
+    """Status observations as three parallel arrays, sorted by store, then timestamp.
+
+    Each observation costs 17 bytes (store key, epoch seconds, is_active flag)
+    instead of a full ORM instance, and a store's run or a time range is a
+    view found by binary search.
+    """
+    __slots__ = ('store_ids', 'times', 'active')
+
+    def __init__(self, store_ids: np.ndarray, times: np.ndarray, active: np.ndarray):
+        self.store_ids = store_ids
+        self.times = times
+        self.active = active
+
+    @classmethod
+    def empty(cls) -> "Observations":
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[int, int, bool]]) -> "Observations":
+        """Build from (store_id, timestamp_utc, is_active) rows"""
+        if not rows:
+            return cls.empty()
+
+        store_ids, times, active = zip(*rows)
+        return cls(
+            np.array(store_ids, dtype=np.int64),
+            np.array(times, dtype=np.int64),
+            np.array(active, dtype=bool)
+        )
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def runs(self, store_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """[start, end) positions of each store's observations"""
+        return (
+            np.searchsorted(self.store_ids, store_ids, side='left'),
+            np.searchsorted(self.store_ids, store_ids, side='right')
+        )
+
+    def slice(self, start: int, end: int) -> "Observations":
+        return Observations(self.store_ids[start:end], self.times[start:end], self.active[start:end])
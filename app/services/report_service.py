@@ -1,35 +1,88 @@
 import asyncio
+import hashlib
 import uuid
 import csv
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple
 import os
+import numpy as np
+import pandas as pd
 
 from app.config.database import AsyncSessionLocal
 from app.models.report import Report, ReportStatus
+from app.models.store import Store
 from app.models.store_status import StoreStatus
-from app.services.uptime_calculation_service import UptimeCalculationService
+from app.repositories.generation_repository import DataSnapshot, GenerationRepository
+from app.services.uptime_calculation_service import UptimeCalculationService, UptimeMetrics
+from app.services.uptime_shard import ShardMetrics
+from app.utils.cpu_executor import run_cpu_bound
 from app.utils.csv_writer import CsvWriter
-from sqlalchemy import select, func
+from sqlalchemy import select
+
+REPORT_COLUMNS = [
+    'store_id',
+    'uptime_last_hour(in minutes)',
+    'uptime_last_day(in hours)',
+    'uptime_last_week(in hours)',
+    'downtime_last_hour(in minutes)',
+    'downtime_last_day(in hours)',
+    'downtime_last_week(in hours)'
+]
+
+# (published generations, latest observation, report format)
+ReportJobKey = Tuple[Tuple, Optional[datetime], str]
 
 class ReportService:
     
     def __init__(self):
         self.uptime_service = UptimeCalculationService()
         self.csv_writer = CsvWriter()
+        self.generations = GenerationRepository()
+        # Report IDs waiting on each running computation, the one that started it first
+        self._jobs: Dict[ReportJobKey, List[str]] = {}
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
 
-    async def trigger_report(self) -> str:
+    async def trigger_report(self, report_format: str = "csv") -> str:
+        # Rejected up front rather than as a failed report
+        self.csv_writer.check_format(report_format)
+        
         report_id = str(uuid.uuid4())
         
+        # Pin the published data so an ingestion swap mid-report cannot mix generations
+        snapshot = await self._get_snapshot()
+        # The newest observation is recorded with the generation pointer, so nothing is scanned for it
+        current_time = snapshot.window(StoreStatus).max_timestamp
+        job_key = (snapshot.key, current_time, report_format)
+        
         async with AsyncSessionLocal() as session:
+            # A report of the same data and parameters that already completed is reused as is
+            existing_path = await self._find_completed_report(session, job_key)
             report = Report(
                 report_id=report_id,
-                status=ReportStatus.RUNNING
+                status=ReportStatus.COMPLETE if existing_path else ReportStatus.RUNNING,
+                file_path=existing_path
             )
             session.add(report)
             await session.commit()
         
-        asyncio.create_task(self._generate_report(report_id))
+        if existing_path:
+            print(f"Report {report_id} reuses {existing_path}")
+            return report_id
+        
+        # Triggers against the same data and parameters share one computation; no await
+        # separates the lookup from the registration, so two triggers cannot both start one
+        if job_key in self._jobs:
+            self._jobs[job_key].append(report_id)
+            print(f"Report {report_id} attached to the running report {self._jobs[job_key][0]}")
+        else:
+            waiters = [report_id]
+            self._jobs[job_key] = waiters
+            task = asyncio.create_task(
+                self._generate_report(job_key, waiters, snapshot, current_time, report_format)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(lambda task: self._release_job(task, job_key, waiters))
         
         return report_id
 
@@ -55,76 +108,148 @@ class ReportService:
             else:
                 return {"status": report.status}
 
-    async def _generate_report(self, report_id: str):
+    async def _generate_report(
+        self,
+        job_key: ReportJobKey,
+        waiters: List[str],
+        snapshot: DataSnapshot,
+        current_time: datetime,
+        report_format: str = "csv"
+    ):
+        """Compute one report and complete every report in ``waiters`` with it"""
+        # The file is named after the job key, so a later trigger for the same data finds it
+        report_id = self._artifact_id(job_key)
         try:
-            current_time = await self._get_max_timestamp()
+            stores = await self._get_all_stores(snapshot)
             
-            store_ids = await self._get_all_store_ids()
-            
-            report_data = []
-            total_stores = len(store_ids)
-            validation_errors = []
+            total_stores = len(stores)
             
             print(f"Generating report for {total_stores} stores...")
             
-            for idx, store_id in enumerate(store_ids):
-                try:
-                    metrics = await self.uptime_service.calculate_store_metrics(
-                        store_id, current_time
+            # Rows are appended shard by shard, so memory does not grow with the fleet
+            stream = await self.csv_writer.open_report(report_id, REPORT_COLUMNS, report_format)
+            validation_errors = []
+            validation_count = 0
+            processed = 0
+            
+            try:
+                async for shard_metrics in self.uptime_service.iter_fleet_metrics(
+                    [store_key for store_key, _ in stores], current_time, snapshot
+                ):
+                    shard_stores = stores[processed:processed + len(shard_metrics.store_ids)]
+                    report_frame, shard_errors = await run_cpu_bound(
+                        self._build_report_frame, shard_stores, shard_metrics
                     )
+                    await stream.write_frame(report_frame)
                     
-                    # ADDED: Validation to catch mathematical errors
-                    validation_result = self._validate_metrics(store_id, metrics)
-                    if validation_result:
-                        validation_errors.append(validation_result)
-                        print(f"Validation warning for store {store_id}: {validation_result}")
-                    
-                    report_data.append({
-                        'store_id': store_id,
-                        'uptime_last_hour(in minutes)': metrics.uptime_last_hour,
-                        'uptime_last_day(in hours)': metrics.uptime_last_day,
-                        'uptime_last_week(in hours)': metrics.uptime_last_week,
-                        'downtime_last_hour(in minutes)': metrics.downtime_last_hour,
-                        'downtime_last_day(in hours)': metrics.downtime_last_day,
-                        'downtime_last_week(in hours)': metrics.downtime_last_week
-                    })
-                    
-                    if (idx + 1) % 100 == 0:
-                        print(f"Processed {idx + 1}/{total_stores} stores")
-                        
-                except Exception as e:
-                    print(f"Error processing store {store_id}: {e}")
-                    # FIXED: Better error handling with zero values
-                    report_data.append({
-                        'store_id': store_id,
-                        'uptime_last_hour(in minutes)': 0.0,
-                        'uptime_last_day(in hours)': 0.0,
-                        'uptime_last_week(in hours)': 0.0,
-                        'downtime_last_hour(in minutes)': 0.0,
-                        'downtime_last_day(in hours)': 0.0,
-                        'downtime_last_week(in hours)': 0.0
-                    })
-                    validation_errors.append(f"Store {store_id}: Processing failed - {str(e)}")
-            
-            file_path = await self.csv_writer.write_report(report_id, report_data)
+                    # Only the first issues are kept for the summary
+                    validation_errors.extend(shard_errors[:max(0, 10 - len(validation_errors))])
+                    validation_count += len(shard_errors)
+                    processed += len(report_frame)
+                    print(f"Processed {processed}/{total_stores} stores")
+                
+                file_path = await stream.commit()
+            except BaseException:
+                await stream.abort()
+                raise
             
             # Log validation summary
-            if validation_errors:
+            if validation_count:
                 print(f"\n=== VALIDATION SUMMARY ===")
-                print(f"Total validation issues: {len(validation_errors)}")
-                for error in validation_errors[:10]:  # Show first 10 errors
+                print(f"Total validation issues: {validation_count}")
+                for error in validation_errors:  # Show first 10 errors
                     print(f"  - {error}")
-                if len(validation_errors) > 10:
-                    print(f"  ... and {len(validation_errors) - 10} more issues")
+                if validation_count > 10:
+                    print(f"  ... and {validation_count - 10} more issues")
                 print("=" * 30)
             
-            await self._update_report_status(report_id, ReportStatus.COMPLETE, file_path)
+            # Detached before the status update, so a later trigger starts afresh instead of attaching
+            self._detach_job(job_key, waiters)
+            await self._update_report_status(waiters, ReportStatus.COMPLETE, file_path)
             
-            print(f"Report {report_id} generated successfully: {file_path}")
+            print(f"Report {report_id} generated successfully: {file_path} ({len(waiters)} requests)")
             
         except Exception as e:
             print(f"Error generating report {report_id}: {e}")
-            await self._update_report_status(report_id, ReportStatus.FAILED, error_message=str(e))
+            self._detach_job(job_key, waiters)
+            await self._update_report_status(waiters, ReportStatus.FAILED, error_message=str(e))
+
+    def _release_job(self, task: asyncio.Task, job_key: ReportJobKey, waiters: List[str]):
+        """Forget a finished job, however it ended, so later triggers never attach to it"""
+        self._tasks.discard(task)
+        self._detach_job(job_key, waiters)
+
+    def _detach_job(self, job_key: ReportJobKey, waiters: List[str]):
+        # A later job for the same key may already have registered once this one detached
+        if self._jobs.get(job_key) is waiters:
+            del self._jobs[job_key]
+
+    async def _find_completed_report(self, session, job_key: ReportJobKey) -> Optional[str]:
+        """File of a report this database completed for ``job_key``, if it still exists.
+
+        Generation numbers restart with a new database while ``reports/`` survives,
+        so only files recorded as complete in this database are trusted.
+        """
+        _, _, report_format = job_key
+        file_path = self.csv_writer.report_path(self._artifact_id(job_key), report_format)
+        stmt = select(Report.id).where(
+            Report.file_path == file_path,
+            Report.status == ReportStatus.COMPLETE
+        ).limit(1)
+        result = await session.execute(stmt)
+        if result.scalar() is None:
+            return None
+        return self.csv_writer.find_report(self._artifact_id(job_key), report_format)
+
+    def _artifact_id(self, job_key: ReportJobKey) -> str:
+        """Stable name of the report file produced for ``job_key``"""
+        snapshot_key, current_time, report_format = job_key
+        # REPORT_COLUMNS is part of the key, so a change of layout never reuses an older file
+        content = repr((snapshot_key, current_time and current_time.isoformat(), report_format, REPORT_COLUMNS))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+    def _build_report_frame(
+        self,
+        stores: List[Tuple[int, str]],
+        shard_metrics: ShardMetrics
+    ) -> Tuple[pd.DataFrame, List[str]]:
+        """Report rows of one shard as columns plus validation issues; runs on the CPU executor"""
+        # FIXED: Better error handling with zero values (a failed store's metrics are zero)
+        report_frame = pd.DataFrame(shard_metrics.values, columns=REPORT_COLUMNS[1:])
+        report_frame.insert(0, 'store_id', [store_id for _, store_id in stores])
+        
+        validation_errors = []
+        for i, error in shard_metrics.errors.items():
+            print(f"Error processing store {stores[i][1]}: {error}")
+            validation_errors.append(f"Store {stores[i][1]}: Processing failed - {str(error)}")
+        
+        # ADDED: Validation to catch mathematical errors
+        for i in np.flatnonzero(self._suspicious_rows(shard_metrics)).tolist():
+            store_id = stores[i][1]
+            validation_result = self._validate_metrics(store_id, UptimeMetrics(*shard_metrics.values[i].tolist()))
+            if validation_result:
+                validation_errors.append(validation_result)
+                print(f"Validation warning for store {store_id}: {validation_result}")
+        
+        return report_frame, validation_errors
+
+    def _suspicious_rows(self, shard_metrics: ShardMetrics) -> np.ndarray:
+        """Rows that fail one of the checks in _validate_metrics, tested a column at a time"""
+        values = shard_metrics.values
+        hour_total = values[:, 0] + values[:, 3]
+        day_total = values[:, 1] + values[:, 4]
+        week_total = values[:, 2] + values[:, 5]
+        
+        suspicious = (
+            (hour_total > 60.1) | (hour_total < 0)
+            | (day_total > 24.1) | (day_total < 0)
+            | (week_total > 168.1) | (week_total < 0)
+            | (values < 0).any(axis=1)
+            | (values == 0).all(axis=1)
+        )
+        # Failed stores are reported as processing failures instead
+        suspicious[list(shard_metrics.errors)] = False
+        return suspicious
 
     def _validate_metrics(self, store_id: str, metrics) -> str:
         """Validate that metrics make mathematical sense"""
@@ -164,36 +289,34 @@ class ReportService:
         
         return None  # No validation errors
 
-    async def _get_max_timestamp(self) -> datetime:
+    async def _get_snapshot(self) -> DataSnapshot:
         async with AsyncSessionLocal() as session:
-            stmt = select(func.max(StoreStatus.timestamp_utc))
-            result = await session.execute(stmt)
-            max_timestamp = result.scalar()
-            return max_timestamp
+            return await self.generations.get_snapshot(session)
 
-    async def _get_all_store_ids(self) -> List[str]:
+    async def _get_all_stores(self, snapshot: DataSnapshot) -> List[Tuple[int, str]]:
+        """(integer key, external store ID) of every store with published observations"""
         async with AsyncSessionLocal() as session:
-            stmt = select(StoreStatus.store_id).distinct()
+            observed = select(StoreStatus.store_id).where(snapshot.visible(StoreStatus))
+            stmt = select(Store.id, Store.external_id).where(Store.id.in_(observed)).order_by(Store.id)
             result = await session.execute(stmt)
-            store_ids = [row[0] for row in result.fetchall()]
-            return store_ids
+            return [(row[0], row[1]) for row in result.fetchall()]
 
     async def _update_report_status(
         self, 
-        report_id: str, 
+        report_ids: List[str], 
         status: ReportStatus, 
         file_path: str = None, 
         error_message: str = None
     ):
         async with AsyncSessionLocal() as session:
-            stmt = select(Report).where(Report.report_id == report_id)
+            stmt = select(Report).where(Report.report_id.in_(report_ids))
             result = await session.execute(stmt)
-            report = result.scalar_one()
             
-            report.status = status
-            if file_path:
-                report.file_path = file_path
-            if error_message:
-                report.error_message = error_message
+            for report in result.scalars().all():
+                report.status = status
+                if file_path:
+                    report.file_path = file_path
+                if error_message:
+                    report.error_message = error_message
             
             await session.commit()
\ No newline at end of file
@@ -1,14 +1,35 @@
-from datetime import datetime, timedelta, time, date
-from typing import Dict, List, Tuple, Optional
+import asyncio
+import multiprocessing
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Tuple, Optional
 import pytz
 from dataclasses import dataclass
 
 from app.config.database import AsyncSessionLocal
 from app.models.store_status import StoreStatus
-from app.models.business_hours import BusinessHours
-from app.models.store_timezone import StoreTimezone
-from sqlalchemy import select, and_, or_
+from app.models.uptime_rollup import UptimeRollup
+from app.repositories.generation_repository import DataSnapshot, GenerationRepository
+from app.repositories.store_config_repository import DEFAULT_TIMEZONE, StoreConfig, StoreConfigCache
+from app.repositories.store_repository import StoreRepository
+from app.utils.cpu_executor import run_cpu_bound
+from app.utils.epoch import from_epoch, to_epoch
+from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload
+import numpy as np
+
+from app.services import uptime_index, uptime_rollup, uptime_shard
+from app.services.observations import Observations
+from app.services.business_calendar import HoursKey
+
+# Worker processes for fleet reports; 1 computes shards on the API process's CPU executor
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(os.cpu_count() or 1)))
+REPORT_SHARD_SIZE = int(os.getenv("REPORT_SHARD_SIZE", "500"))
+OBSERVATION_FETCH_SIZE = 20000
+UPTIME_INDEX_CACHE_SIZE = int(os.getenv("UPTIME_INDEX_CACHE_SIZE", "1024"))
 
 @dataclass
 class UptimeMetrics:
@@ -19,305 +40,437 @@ class UptimeMetrics:
     downtime_last_day: float   
     downtime_last_week: float  
 
+@dataclass
+class RangeMetrics:
+    start_time: datetime
+    end_time: datetime
+    business_hours: float
+    uptime_hours: float
+    downtime_hours: float
+
 class UptimeCalculationService:
     
     def __init__(self):
-        self.default_timezone = "America/Chicago"
+        self.default_timezone = DEFAULT_TIMEZONE
+        self.generations = GenerationRepository()
+        self.stores = StoreRepository()
+        self.store_configs = StoreConfigCache(self.default_timezone)
+        self.workers = REPORT_WORKERS
+        self.shard_size = REPORT_SHARD_SIZE
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._indexes: "OrderedDict[Tuple, Tuple[uptime_index.UptimeIndex, Tuple[int, int]]]" = OrderedDict()
 
-    async def calculate_store_metrics(self, store_id: str, current_time: datetime) -> UptimeMetrics:
+    async def calculate_store_metrics(
+        self,
+        store_id: int,
+        current_time: datetime,
+        snapshot: Optional[DataSnapshot] = None
+    ) -> UptimeMetrics:
         
         async with AsyncSessionLocal() as session:
-            timezone_str = await self._get_store_timezone(session, store_id)
-            store_tz = pytz.timezone(timezone_str)
+            if snapshot is None:
+                snapshot = await self.generations.get_snapshot(session)
             
-            business_hours = await self._get_business_hours(session, store_id)
+            store_config = await self.store_configs.get(session, snapshot)
             
-            one_hour_ago = current_time - timedelta(hours=1)
-            one_day_ago = current_time - timedelta(days=1)
             one_week_ago = current_time - timedelta(weeks=1)
             
-            status_observations = await self._get_status_observations(
-                session, store_id, one_week_ago, current_time )
-            
-            # FIXED: All calculations now return hours consistently
-            uptime_last_hour_hours = await self._calculate_uptime_for_period(
-                status_observations, business_hours, store_tz, one_hour_ago, current_time )
-            
-            uptime_last_day_hours = await self._calculate_uptime_for_period(
-                status_observations, business_hours, store_tz, one_day_ago, current_time )
-            
-            uptime_last_week_hours = await self._calculate_uptime_for_period(
-                status_observations, business_hours, store_tz, one_week_ago, current_time )
-            
-            total_hours_last_hour = await self._calculate_total_business_hours(
-                business_hours, store_tz, one_hour_ago, current_time)
-            
-            total_hours_last_day = await self._calculate_total_business_hours(
-                business_hours, store_tz, one_day_ago, current_time )
-            
-            total_hours_last_week = await self._calculate_total_business_hours(
-                business_hours, store_tz, one_week_ago, current_time)
-            
-            # FIXED: Consistent unit calculations
-            downtime_last_hour_hours = max(0, total_hours_last_hour - uptime_last_hour_hours)
-            downtime_last_day_hours = max(0, total_hours_last_day - uptime_last_day_hours)
-            downtime_last_week_hours = max(0, total_hours_last_week - uptime_last_week_hours)
-            
-            # FIXED: Better rounding to avoid floating point issues
-            return UptimeMetrics(
-                uptime_last_hour=self._safe_round(uptime_last_hour_hours * 60, 2),  # Convert to minutes
-                uptime_last_day=self._safe_round(uptime_last_day_hours, 2),
-                uptime_last_week=self._safe_round(uptime_last_week_hours, 2),
-                downtime_last_hour=self._safe_round(downtime_last_hour_hours * 60, 2),  # Convert to minutes
-                downtime_last_day=self._safe_round(downtime_last_day_hours, 2),
-                downtime_last_week=self._safe_round(downtime_last_week_hours, 2)
-            )
+            observations = await self._get_status_observations(
+                session, snapshot, store_id, one_week_ago, current_time )
+        
+        return await run_cpu_bound(
+            self._compute_metrics,
+            observations.times,
+            observations.active,
+            store_config.business_hours(store_id),
+            store_config.timezone(store_id),
+            current_time
+        )
 
-    def _safe_round(self, value: float, decimals: int = 2) -> float:
-        """Round with better floating point handling"""
-        return round(float(value), decimals)
+    async def calculate_range_metrics(
+        self,
+        store_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        snapshot: Optional[DataSnapshot] = None
+    ) -> RangeMetrics:
+        """Uptime and downtime of one store over an arbitrary [start_time, end_time).
 
-    async def _get_store_timezone(self, session, store_id: str) -> str:
-        stmt = select(StoreTimezone).where(StoreTimezone.store_id == store_id)
-        result = await session.execute(stmt)
-        timezone_record = result.scalar_one_or_none()
+        The range is clamped to the observed data, from the first to the newest
+        observation of the whole fleet, and a range entirely outside it raises
+        ValueError rather than reporting zero hours. Unlike the fixed report windows, a
+        status is never re-extended to the range start: every moment keeps the
+        status the interpolation of its whole business interval gives it.
+        """
+        async with AsyncSessionLocal() as session:
+            if snapshot is None:
+                snapshot = await self.generations.get_snapshot(session)
+            
+            index, (coverage_start, coverage_end) = await self._get_uptime_index(session, snapshot, store_id)
         
-        return timezone_record.timezone_str if timezone_record else self.default_timezone
-
-    async def _get_business_hours(self, session, store_id: str) -> List[BusinessHours]:
-        stmt = select(BusinessHours).where(BusinessHours.store_id == store_id)
-        result = await session.execute(stmt)
-        business_hours = result.scalars().all()
+        if to_epoch(end_time) <= coverage_start or to_epoch(start_time) >= coverage_end:
+            raise ValueError(
+                f"No store status data between {start_time.isoformat()} and {end_time.isoformat()}; "
+                f"observations cover {from_epoch(coverage_start).isoformat()} to {from_epoch(coverage_end).isoformat()}"
+            )
         
-        if not business_hours:
-            return self._create_24_7_business_hours(store_id)
+        start = max(to_epoch(start_time), coverage_start)
+        end = max(min(to_epoch(end_time), coverage_end), start)
+        business_seconds, active_seconds = index.query(start, end)
         
-        return list(business_hours)
+        return RangeMetrics(
+            start_time=from_epoch(start),
+            end_time=from_epoch(end),
+            business_hours=round(business_seconds / 3600, 2),
+            uptime_hours=round(active_seconds / 3600, 2),
+            downtime_hours=round(max(0, business_seconds - active_seconds) / 3600, 2)
+        )
 
-    def _create_24_7_business_hours(self, store_id: str) -> List[BusinessHours]:
-        business_hours = []
-        for day in range(7):  
-            bh = BusinessHours()
-            bh.store_id = store_id
-            bh.day_of_week = day
-            bh.start_time_local = time(0, 0, 0)  
-            bh.end_time_local = time(23, 59, 59)  
-            business_hours.append(bh)
-        return business_hours
+    async def get_store_timezone(self, store_id: int) -> pytz.BaseTzInfo:
+        async with AsyncSessionLocal() as session:
+            snapshot = await self.generations.get_snapshot(session)
+            store_config = await self.store_configs.get(session, snapshot)
+        return store_config.timezone(store_id)
 
-    async def _get_status_observations(
-        self, 
-        session, 
-        store_id: str, 
-        start_time: datetime, 
-        end_time: datetime
-    ) -> List[StoreStatus]:
-        stmt = select(StoreStatus).where(
-            and_(
-                StoreStatus.store_id == store_id,
-                StoreStatus.timestamp_utc >= start_time,
-                StoreStatus.timestamp_utc <= end_time
-            )
-        ).order_by(StoreStatus.timestamp_utc)
+    async def iter_fleet_metrics(
+        self,
+        store_ids: List[int],
+        current_time: datetime,
+        snapshot: DataSnapshot
+    ) -> AsyncIterator[uptime_shard.ShardMetrics]:
+        """Yield the metrics of each shard as columns, in the order of ``store_ids``.
+
+        Each shard's data is read from bulk queries over its own range of store
+        keys just before it is computed, so memory is bounded by the shard size
+        and the number of shards in flight rather than by the fleet size.
+
+        With a published uptime rollup, intervals inside the windows come from
+        the rollup and only the observations near the window edges are read;
+        otherwise the whole week of observations is.
+
+        A failure for one store is recorded in its shard's errors rather than
+        aborting the whole batch.
+        """
+        async with AsyncSessionLocal() as session:
+            store_config = await self.store_configs.get(session, snapshot)
+        
+        # The rollup is published together with the observations it was built from
+        use_rollup = snapshot.window(UptimeRollup).live > 0
+        store_keys = np.asarray(store_ids, dtype=np.int64)
+        in_flight = deque()
         
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
+        try:
+            for i in range(0, len(store_keys), self.shard_size):
+                shard = await self._load_shard(
+                    store_keys[i:i + self.shard_size], store_config, current_time, snapshot, use_rollup
+                )
+                
+                if self.workers <= 1:
+                    # One shard at a time, so the event loop gets a turn between shards
+                    yield await run_cpu_bound(uptime_shard.compute_shard, shard)
+                    continue
+                
+                # Keep every worker busy while the next shard is read, but no more than that
+                in_flight.append(asyncio.ensure_future(self._run_in_pool(shard)))
+                if len(in_flight) > self.workers:
+                    yield await in_flight.popleft()
+            
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            for future in in_flight:
+                future.cancel()
 
-    async def _calculate_uptime_for_period(
+    async def _load_shard(
         self,
-        status_observations: List[StoreStatus],
-        business_hours: List[BusinessHours],
-        store_tz: pytz.timezone,
-        start_time: datetime,
-        end_time: datetime
-    ) -> float:
-        """FIXED: Always returns hours regardless of period length"""
+        store_keys: np.ndarray,
+        store_config: StoreConfig,
+        current_time: datetime,
+        snapshot: DataSnapshot,
+        use_rollup: bool
+    ) -> uptime_shard.FleetShard:
+        one_week_ago = current_time - timedelta(weeks=1)
+        store_range = (int(store_keys.min()), int(store_keys.max()))
+        rollup = None
         
-        start_local = start_time.replace(tzinfo=pytz.UTC).astimezone(store_tz)
-        end_local = end_time.replace(tzinfo=pytz.UTC).astimezone(store_tz)
+        async with AsyncSessionLocal() as session:
+            if use_rollup:
+                rollup = await self._get_rollup_intervals(
+                    session, snapshot, one_week_ago, current_time, store_range
+                )
+                observations = await self._get_edge_observations(
+                    session, snapshot, one_week_ago, current_time, store_range
+                )
+            else:
+                observations = await self._get_all_status_observations(
+                    session, snapshot, one_week_ago, current_time, store_range
+                )
         
-        total_uptime = 0.0
-        current_time = start_local
+        # Observations are sorted by (store, timestamp): each store's run is found by binary search
+        # and shipped to the workers as array slices, without building per-store Python lists
+        run_starts, run_ends = observations.runs(store_keys)
         
-        while current_time < end_local:
-            # FIXED: Use proper date boundaries instead of artificial day-end times
-            next_day = (current_time + timedelta(days=1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            day_end = min(end_local, next_day)
-            
-            day_business_hours = self._get_business_hours_for_day(
-                business_hours, current_time.weekday()
+        shard_rollup = None
+        if rollup is not None:
+            rollup_stores = rollup[0]
+            shard_rollup = self._build_rollup_runs(
+                np.searchsorted(rollup_stores, store_keys, side='left'),
+                np.searchsorted(rollup_stores, store_keys, side='right'),
+                rollup
             )
-            
-            if day_business_hours:
-                day_uptime = self._calculate_day_uptime(
-                    status_observations, day_business_hours, store_tz,
-                    current_time, day_end
-                )
-                total_uptime += day_uptime
-            
-            current_time = next_day
         
-        # FIXED: Always return hours (removed the conditional unit conversion)
-        return total_uptime
+        return self._build_shard(
+            store_keys, run_starts, run_ends, observations, store_config, current_time, shard_rollup
+        )
 
-    def _get_business_hours_for_day(
-        self, 
-        business_hours: List[BusinessHours], 
-        weekday: int
-    ) -> Optional[BusinessHours]:
-        for bh in business_hours:
-            if bh.day_of_week == weekday:
-                return bh
-        return None
+    def _build_shard(
+        self,
+        store_keys: np.ndarray,
+        run_starts: np.ndarray,
+        run_ends: np.ndarray,
+        observations: Observations,
+        store_config: StoreConfig,
+        current_time: datetime,
+        rollup: Optional[uptime_shard.RollupRuns] = None
+    ) -> uptime_shard.FleetShard:
+        # Stores arrive in key order, so a shard's observations form one contiguous block
+        low = int(run_starts.min(initial=0))
+        high = int(run_ends.max(initial=0))
+        store_ids = store_keys.tolist()
+        block = observations.slice(low, high)
+        
+        return uptime_shard.FleetShard(
+            store_ids=store_keys,
+            run_starts=run_starts - low,
+            run_ends=run_ends - low,
+            obs_times=block.times,
+            obs_active=block.active,
+            hours=tuple(store_config.business_hours(store_id) for store_id in store_ids),
+            timezones=tuple(store_config.timezone(store_id).zone for store_id in store_ids),
+            current_time=current_time,
+            rollup=rollup
+        )
 
-    def _calculate_day_uptime(
+    def _build_rollup_runs(
         self,
-        status_observations: List[StoreStatus],
-        business_hours: BusinessHours,
-        store_tz: pytz.timezone,
-        day_start: datetime,
-        day_end: datetime
-    ) -> float:
-        """FIXED: Better handling of overnight business hours"""
+        run_starts: np.ndarray,
+        run_ends: np.ndarray,
+        rollup: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    ) -> uptime_shard.RollupRuns:
+        _, interval_starts, interval_ends, interval_active = rollup
+        low = int(run_starts.min(initial=0))
+        high = int(run_ends.max(initial=0))
         
-        # Get the date for this calculation
-        calculation_date = day_start.date()
+        return uptime_shard.RollupRuns(
+            run_starts=run_starts - low,
+            run_ends=run_ends - low,
+            interval_starts=interval_starts[low:high],
+            interval_ends=interval_ends[low:high],
+            interval_active=interval_active[low:high]
+        )
+
+    async def _run_in_pool(self, shard: uptime_shard.FleetShard) -> uptime_shard.ShardMetrics:
+        if self._pool is None:
+            # Spawned rather than forked: the parent runs the database driver's threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
         
-        # Create business hours boundaries for this specific date
-        bh_start = store_tz.localize(datetime.combine(
-            calculation_date, business_hours.start_time_local
-        ))
-        bh_end = store_tz.localize(datetime.combine(
-            calculation_date, business_hours.end_time_local
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, uptime_shard.compute_shard, shard)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next report instead of failing forever
+            pool.shutdown(wait=False)
+            if self._pool is pool:
+                self._pool = None
+            raise
+
+    def _compute_metrics(
+        self,
+        obs_times: np.ndarray,
+        obs_active: np.ndarray,
+        business_hours: HoursKey,
+        store_tz: pytz.BaseTzInfo,
+        current_time: datetime
+    ) -> UptimeMetrics:
+        return UptimeMetrics(*uptime_shard.compute_metrics(
+            obs_times, obs_active, business_hours, store_tz.zone, current_time
         ))
+
+    async def _get_uptime_index(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        store_id: int
+    ) -> Tuple[uptime_index.UptimeIndex, Tuple[int, int]]:
+        """The store's index over the observed range, cached until new data is published"""
+        key = (snapshot.key, store_id)
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key]
         
-        # Handle overnight business hours (e.g., 22:00 - 06:00 next day)
-        if business_hours.end_time_local <= business_hours.start_time_local:
-            bh_end += timedelta(days=1)
-        
-        # Find the intersection of business hours with our calculation period
-        period_start = max(bh_start, day_start)
-        period_end = min(bh_end, day_end)
-        
-        if period_start >= period_end:
-            return 0.0
-        
-        # Get observations that fall within business hours for this period
-        business_observations = []
-        for obs in status_observations:
-            obs_local = obs.timestamp_utc.replace(tzinfo=pytz.UTC).astimezone(store_tz)
-            if period_start <= obs_local <= period_end:
-                business_observations.append((obs_local, obs.status))
+        bounds = await session.execute(
+            select(func.min(StoreStatus.timestamp_utc), func.max(StoreStatus.timestamp_utc))
+            .where(snapshot.visible(StoreStatus))
+        )
+        coverage_start, coverage_end = bounds.one()
+        if coverage_end is None:
+            raise ValueError("No store status data has been ingested yet")
         
-        if not business_observations:
-            # No observations during business hours - assume active (default behavior)
-            return (period_end - period_start).total_seconds() / 3600
+        store_config = await self.store_configs.get(session, snapshot)
+        observations = await self._get_store_observations(session, snapshot, store_id)
+        interval_starts, interval_ends = uptime_rollup.whole_intervals(
+            store_config.business_hours(store_id),
+            store_config.timezone(store_id).zone,
+            coverage_start,
+            coverage_end
+        )
+        index = await run_cpu_bound(
+            uptime_index.build_index, observations.times, observations.active, interval_starts, interval_ends
+        )
         
-        return self._interpolate_uptime(business_observations, period_start, period_end)
+        self._indexes[key] = (index, (coverage_start, coverage_end))
+        if len(self._indexes) > UPTIME_INDEX_CACHE_SIZE:
+            self._indexes.popitem(last=False)
+        return self._indexes[key]
 
-    def _interpolate_uptime(
+    async def _get_status_observations(
         self, 
-        observations: List[Tuple[datetime, str]], 
-        period_start: datetime, 
-        period_end: datetime
-    ) -> float:
-        """FIXED: Improved interpolation logic with better boundary handling"""
-        
-        if not observations:
-            return (period_end - period_start).total_seconds() / 3600
-        
-        total_duration = (period_end - period_start).total_seconds()
-        uptime_seconds = 0.0
-        
-        # Sort observations by timestamp
-        observations.sort(key=lambda x: x[0])
-        
-        # Extend observations to cover the entire period
-        extended_observations = observations.copy()
-        
-        # If first observation is after period start, extend backwards
-        if observations[0][0] > period_start:
-            # Use the first observation's status for the beginning
-            extended_observations.insert(0, (period_start, observations[0][1]))
+        session, 
+        snapshot: DataSnapshot,
+        store_id: int, 
+        start_time: datetime, 
+        end_time: datetime
+    ) -> Observations:
+        return await self._get_store_observations(session, snapshot, store_id, and_(
+            StoreStatus.timestamp_utc >= to_epoch(start_time),
+            StoreStatus.timestamp_utc <= to_epoch(end_time)
+        ))
+
+    async def _get_store_observations(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        store_id: int,
+        condition=None
+    ) -> Observations:
+        """One store's observations in timestamp order, selecting only the two columns the math needs"""
+        stmt = select(StoreStatus.timestamp_utc, StoreStatus.is_active).where(
+            StoreStatus.store_id == store_id,
+            snapshot.visible(StoreStatus)
+        ).order_by(StoreStatus.timestamp_utc)
+        if condition is not None:
+            stmt = stmt.where(condition)
         
-        # If last observation is before period end, extend forwards
-        if observations[-1][0] < period_end:
-            # Use the last observation's status for the end
-            extended_observations.append((period_end, observations[-1][1]))
+        times, active = await self._stream_columns(session, stmt, (np.int64, bool))
+        return Observations(np.full(len(times), store_id, dtype=np.int64), times, active)
+
+    async def _get_all_status_observations(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        start_time: datetime,
+        end_time: datetime,
+        store_range: Tuple[int, int]
+    ) -> Observations:
+        return await self._stream_observations(session, snapshot, store_range, and_(
+            StoreStatus.timestamp_utc >= to_epoch(start_time),
+            StoreStatus.timestamp_utc <= to_epoch(end_time)
+        ))
+
+    async def _get_edge_observations(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        start_time: datetime,
+        end_time: datetime,
+        store_range: Tuple[int, int]
+    ) -> Observations:
+        """Observations a rollup-based report still needs: those near the week start and near the end.
+
+        The day and hour windows start inside the last MAX_INTERVAL_SECONDS as
+        well, so these two ranges cover every interval a window start or end
+        can cut through.
+        """
+        start_epoch = to_epoch(start_time)
+        end_epoch = to_epoch(end_time)
         
-        # Calculate uptime for each segment
-        for i in range(len(extended_observations) - 1):
-            current_time, current_status = extended_observations[i]
-            next_time, _ = extended_observations[i + 1]
-            
-            # Ensure we're within our calculation period
-            segment_start = max(current_time, period_start)
-            segment_end = min(next_time, period_end)
-            
-            if segment_start < segment_end and current_status == 'active':
-                uptime_seconds += (segment_end - segment_start).total_seconds()
+        return await self._stream_observations(session, snapshot, store_range, or_(
+            StoreStatus.timestamp_utc.between(start_epoch, start_epoch + uptime_rollup.MAX_INTERVAL_SECONDS),
+            StoreStatus.timestamp_utc.between(end_epoch - uptime_rollup.MAX_INTERVAL_SECONDS, end_epoch)
+        ))
+
+    async def _stream_observations(
+        self,
+        session,
+        snapshot: DataSnapshot,
+        store_range: Tuple[int, int],
+        condition
+    ) -> Observations:
+        """Observations of the stores whose keys lie within the inclusive ``store_range``"""
+        stmt = select(
+            StoreStatus.store_id,
+            StoreStatus.timestamp_utc,
+            StoreStatus.is_active
+        ).where(
+            StoreStatus.store_id.between(*store_range),
+            condition,
+            snapshot.visible(StoreStatus)
+        ).order_by(StoreStatus.store_id, StoreStatus.timestamp_utc)
         
-        return uptime_seconds / 3600
+        return Observations(*await self._stream_columns(session, stmt, (np.int64, np.int64, bool)))
 
-    async def _calculate_total_business_hours(
+    async def _get_rollup_intervals(
         self,
-        business_hours: List[BusinessHours],
-        store_tz: pytz.timezone,
+        session,
+        snapshot: DataSnapshot,
         start_time: datetime,
-        end_time: datetime
-    ) -> float:
-        """FIXED: Improved business hours calculation with better date handling"""
+        end_time: datetime,
+        store_range: Tuple[int, int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(store keys, starts, ends, active seconds) of rolled-up intervals overlapping the window.
+
+        An appended load re-publishes the intervals it touched under a newer
+        generation, and the copies it replaced stay visible until the next
+        load prunes them, so only the latest row of each interval is kept.
+        """
+        stmt = select(
+            UptimeRollup.store_id,
+            UptimeRollup.interval_start,
+            UptimeRollup.interval_end,
+            UptimeRollup.active_seconds
+        ).where(
+            UptimeRollup.store_id.between(*store_range),
+            UptimeRollup.interval_end > to_epoch(start_time),
+            UptimeRollup.interval_start < to_epoch(end_time),
+            snapshot.visible(UptimeRollup)
+        ).order_by(UptimeRollup.store_id, UptimeRollup.interval_start, UptimeRollup.generation)
         
-        start_local = start_time.replace(tzinfo=pytz.UTC).astimezone(store_tz)
-        end_local = end_time.replace(tzinfo=pytz.UTC).astimezone(store_tz)
+        store_keys, starts, ends, active = await self._stream_columns(
+            session, stmt, (np.int64, np.int64, np.int64, np.float64)
+        )
         
-        total_hours = 0.0
-        current_date = start_local.date()
-        end_date = end_local.date()
+        latest = np.ones(len(store_keys), dtype=bool)
+        latest[:-1] = (store_keys[1:] != store_keys[:-1]) | (starts[1:] != starts[:-1])
+        return store_keys[latest], starts[latest], ends[latest], active[latest]
+
+    async def _stream_columns(self, session, stmt, dtypes: Tuple) -> Tuple[np.ndarray, ...]:
+        """Fetch a query's columns as NumPy arrays"""
+        # Streamed in partitions so the event loop is not held for the whole fetch
+        parts = []
+        result = await session.stream(stmt)
+        async for rows in result.partitions(OBSERVATION_FETCH_SIZE):
+            parts.append(self._to_arrays(rows, dtypes))
         
-        # Process each day in the period
-        while current_date <= end_date:
-            day_business_hours = self._get_business_hours_for_day(
-                business_hours, current_date.weekday()
-            )
-            
-            if not day_business_hours:
-                current_date += timedelta(days=1)
-                continue
-            
-            # Create day boundaries
-            day_start = store_tz.localize(datetime.combine(current_date, time.min))
-            day_end = store_tz.localize(datetime.combine(current_date, time.max))
-            
-            # Intersect with the period we're calculating
-            period_start_for_day = max(start_local, day_start)
-            period_end_for_day = min(end_local, day_end)
-            
-            if period_start_for_day >= period_end_for_day:
-                current_date += timedelta(days=1)
-                continue
-            
-            # Calculate business hours for this day
-            bh_start = store_tz.localize(datetime.combine(
-                current_date, day_business_hours.start_time_local
-            ))
-            bh_end = store_tz.localize(datetime.combine(
-                current_date, day_business_hours.end_time_local
-            ))
-            
-            # Handle overnight business hours
-            if day_business_hours.end_time_local <= day_business_hours.start_time_local:
-                bh_end += timedelta(days=1)
-            
-            # Find intersection of business hours with our calculation period for this day
-            effective_start = max(bh_start, period_start_for_day)
-            effective_end = min(bh_end, period_end_for_day)
-            
-            if effective_start < effective_end:
-                total_hours += (effective_end - effective_start).total_seconds() / 3600
-            
-            current_date += timedelta(days=1)
+        if not parts:
+            return self._to_arrays([], dtypes)
+        
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def _to_arrays(self, rows, dtypes: Tuple) -> Tuple[np.ndarray, ...]:
+        if not rows:
+            return tuple(np.empty(0, dtype=dtype) for dtype in dtypes)
         
-        return total_hours
\ No newline at end of file
+        return tuple(np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes))
@@ -0,0 +1,84 @@
+"""Prefix-sum index of a store's business and active seconds over time.
+
+Uptime is interpolated once over whole business intervals, as in the
+rollup, which turns it into a piecewise-constant function of time. The index
+stores the running totals at every breakpoint, so the business and active
+seconds of any [start, end) take two binary searches and a subtraction.
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+@dataclass(frozen=True)
+class UptimeIndex:
+    # Segment i runs from points[i] to points[i + 1] and is open/active at the given rates (0 or 1)
+    points: np.ndarray
+    business_rate: np.ndarray
+    active_rate: np.ndarray
+    cumulative_business: np.ndarray
+    cumulative_active: np.ndarray
+
+    def query(self, start: int, end: int) -> Tuple[int, float]:
+        """(business seconds, active seconds) within [start, end)"""
+        start_business, start_active = self._totals_at(start)
+        end_business, end_active = self._totals_at(end)
+        return end_business - start_business, end_active - start_active
+
+    def _totals_at(self, moment: int) -> Tuple[int, float]:
+        i = int(np.searchsorted(self.points, moment, side='right')) - 1
+        if i < 0:
+            return 0, 0.0
+
+        elapsed = moment - int(self.points[i])
+        return (
+            int(self.cumulative_business[i]) + int(self.business_rate[i]) * elapsed,
+            float(self.cumulative_active[i]) + int(self.active_rate[i]) * elapsed
+        )
+
+def build_index(
+    obs_times: np.ndarray,
+    obs_active: np.ndarray,
+    interval_starts: np.ndarray,
+    interval_ends: np.ndarray
+) -> UptimeIndex:
+    """Index sorted, disjoint business intervals and the sorted observations inside them.
+
+    Within an interval the first status also covers the time before the
+    first observation and each status holds until the next one; an interval
+    without observations counts as active throughout.
+    """
+    firsts = np.searchsorted(obs_times, interval_starts, side='left').tolist()
+    lasts = np.searchsorted(obs_times, interval_ends, side='right').tolist()
+
+    points = []
+    business_rate = []
+    active_rate = []
+
+    for start, end, first, last in zip(interval_starts.tolist(), interval_ends.tolist(), firsts, lasts):
+        if first < last:
+            # The first observation's status runs from the interval start to the second observation
+            points.append(np.concatenate(([start], obs_times[first + 1:last], [end])))
+            active_rate.append(np.concatenate((obs_active[first:last], [False])))
+        else:
+            points.append(np.array([start, end], dtype=np.int64))
+            active_rate.append(np.array([True, False]))
+
+        business_rate.append(np.zeros(len(points[-1]), dtype=bool))
+        business_rate[-1][:-1] = True
+
+    if not points:
+        empty = np.empty(0, dtype=np.int64)
+        return UptimeIndex(empty, empty.astype(bool), empty.astype(bool), empty, empty.astype(np.float64))
+
+    points = np.concatenate(points).astype(np.int64)
+    business_rate = np.concatenate(business_rate)
+    active_rate = np.concatenate(active_rate).astype(bool)
+
+    lengths = np.diff(points)
+    cumulative_business = np.zeros(len(points), dtype=np.int64)
+    cumulative_active = np.zeros(len(points), dtype=np.float64)
+    np.cumsum(lengths * business_rate[:-1], out=cumulative_business[1:])
+    np.cumsum(lengths * active_rate[:-1], out=cumulative_active[1:])
+
+    return UptimeIndex(points, business_rate, active_rate, cumulative_business, cumulative_active)
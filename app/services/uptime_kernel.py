@@ -0,0 +1,46 @@
+"""Vectorized uptime interpolation over epoch-second arrays.
+
+Semantics match the original per-observation interpolation: inside each
+business interval the first observation's status is extended back to the
+interval start, every status holds until the next observation, the last
+status is extended to the interval end, and an interval without any
+observation counts as fully active.
+"""
+import numpy as np
+
+def active_seconds(
+    obs_times: np.ndarray,
+    obs_active: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> np.ndarray:
+    """Active seconds inside each [starts[i], ends[i]] interval.
+
+    ``obs_times`` must be sorted ascending. Observations on either boundary
+    belong to the interval, as in the original inclusive filter.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    lengths = (ends - starts).astype(np.float64)
+    
+    if len(obs_times) == 0 or len(starts) == 0:
+        return lengths
+    
+    obs_times = np.asarray(obs_times, dtype=np.int64)
+    obs_active = np.asarray(obs_active, dtype=bool)
+    
+    # held[k] = active seconds from obs_times[0] to obs_times[k], each status held until the next observation
+    held = np.zeros(len(obs_times), dtype=np.float64)
+    np.cumsum(np.diff(obs_times) * obs_active[:-1], out=held[1:])
+    
+    first = np.searchsorted(obs_times, starts, side='left')
+    last = np.searchsorted(obs_times, ends, side='right') - 1
+    observed = last >= first
+    
+    first = np.minimum(first, len(obs_times) - 1)
+    last = np.maximum(last, 0)
+    
+    leading = (obs_times[first] - starts) * obs_active[first]
+    trailing = (ends - obs_times[last]) * obs_active[last]
+    
+    return np.where(observed, leading + held[last] - held[first] + trailing, lengths)
@@ -0,0 +1,104 @@
+"""Uptime rollup: interpolated uptime per business interval, and windows assembled from it.
+
+Interpolation never crosses a business interval's edges, so an interval's
+uptime depends only on the observations inside it. A window's uptime is the
+rolled-up uptime of every interval it fully contains, plus the intervals cut
+by its start and end, which are recomputed from the raw observations near
+those two edges.
+"""
+from datetime import datetime
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services import business_calendar, uptime_kernel
+from app.services.business_calendar import HoursKey
+from app.utils.epoch import to_epoch
+
+# A business interval lies within one local day, which lasts at most 25 hours
+MAX_INTERVAL_SECONDS = 26 * 3600
+
+def rollup_store(
+    obs_times: np.ndarray,
+    obs_active: np.ndarray,
+    business_hours: HoursKey,
+    timezone_str: str,
+    range_start: int,
+    range_end: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(starts, ends, active seconds, observation count) of the whole intervals touching the range.
+
+    ``obs_times`` must hold every observation of the store within
+    MAX_INTERVAL_SECONDS of the range.
+    """
+    starts, ends = whole_intervals(business_hours, timezone_str, range_start, range_end)
+    active = uptime_kernel.active_seconds(obs_times, obs_active, starts, ends)
+    counts = np.searchsorted(obs_times, ends, side='right') - np.searchsorted(obs_times, starts, side='left')
+    return starts, ends, active, counts
+
+def whole_intervals(
+    business_hours: HoursKey,
+    timezone_str: str,
+    range_start: int,
+    range_end: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Business intervals touching [range_start, range_end], without clipping them to it"""
+    # Compiled with a margin so the intervals touching the range are never clipped
+    starts, ends = business_calendar.compile_calendar(
+        business_hours,
+        timezone_str,
+        range_start - MAX_INTERVAL_SECONDS,
+        range_end + MAX_INTERVAL_SECONDS
+    )
+    touching = (ends >= range_start) & (starts <= range_end)
+    return starts[touching], ends[touching]
+
+def calculate_windows(
+    interval_starts: np.ndarray,
+    interval_ends: np.ndarray,
+    interval_active: np.ndarray,
+    edge_times: np.ndarray,
+    edge_active: np.ndarray,
+    window_starts: List[datetime],
+    end_time: datetime
+) -> List[Tuple[float, float]]:
+    """(uptime hours, business hours) for each window [window_start, end_time].
+
+    ``edge_times`` must hold the store's observations within
+    MAX_INTERVAL_SECONDS after each window start and before ``end_time``.
+    Pieces are summed in the same order as the raw calculation, so both give
+    identical results.
+    """
+    end_epoch = to_epoch(end_time)
+    
+    results = []
+    for window_start in window_starts:
+        window_epoch = to_epoch(window_start)
+        first = int(np.searchsorted(interval_starts, window_epoch, side='left'))
+        last = int(np.searchsorted(interval_ends, end_epoch, side='right'))
+        
+        window_active = interval_active[first:last].tolist()
+        window_business = (interval_ends[first:last] - interval_starts[first:last]).tolist()
+        
+        # Interval cut by the window start, and by its end too when it spans the whole window
+        if first > 0 and interval_ends[first - 1] > window_epoch:
+            clipped_end = min(int(interval_ends[first - 1]), end_epoch)
+            window_active.insert(0, _clipped_active(edge_times, edge_active, window_epoch, clipped_end))
+            window_business.insert(0, clipped_end - window_epoch)
+        
+        # Interval cut by the window end only
+        if first <= last < len(interval_starts) and interval_starts[last] < end_epoch:
+            clipped_start = int(interval_starts[last])
+            window_active.append(_clipped_active(edge_times, edge_active, clipped_start, end_epoch))
+            window_business.append(end_epoch - clipped_start)
+        
+        results.append((
+            sum(seconds / 3600 for seconds in window_active),
+            sum(seconds / 3600 for seconds in window_business)
+        ))
+    
+    return results
+
+def _clipped_active(obs_times: np.ndarray, obs_active: np.ndarray, start: int, end: int) -> float:
+    active = uptime_kernel.active_seconds(obs_times, obs_active, np.array([start]), np.array([end]))
+    return float(active[0])
@@ -0,0 +1,189 @@
+"""Uptime math for a shard of stores, runnable in a worker process.
+
+A shard carries plain arrays, hashable schedules and timezone names instead of
+ORM objects, so it pickles compactly and needs no database access.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services import business_calendar, uptime_kernel, uptime_rollup
+from app.services.business_calendar import HoursKey
+from app.utils.epoch import to_epoch
+
+# (uptime hour in minutes, uptime day, uptime week, downtime hour in minutes, downtime day, downtime week)
+MetricValues = Tuple[float, float, float, float, float, float]
+METRIC_COUNT = 6
+
+@dataclass(frozen=True)
+class RollupRuns:
+    """Rolled-up business intervals of a shard's stores, sorted by store, then start"""
+    run_starts: np.ndarray
+    run_ends: np.ndarray
+    interval_starts: np.ndarray
+    interval_ends: np.ndarray
+    interval_active: np.ndarray
+
+@dataclass(frozen=True)
+class FleetShard:
+    store_ids: np.ndarray
+    # Bounds of each store's run in the observation arrays, relative to this shard
+    run_starts: np.ndarray
+    run_ends: np.ndarray
+    obs_times: np.ndarray
+    obs_active: np.ndarray
+    hours: Tuple[HoursKey, ...]
+    timezones: Tuple[str, ...]
+    current_time: datetime
+    # With a rollup, the observation arrays only hold the raw data near the window edges
+    rollup: Optional[RollupRuns] = None
+
+@dataclass(frozen=True)
+class ShardMetrics:
+    """Metric values of a shard's stores as columns, in shard order"""
+    store_ids: np.ndarray
+    # One row per store, one column per MetricValues field; a failed store's row is zero
+    values: np.ndarray
+    # Exception of each failed store by its position in the shard
+    errors: Dict[int, Exception]
+
+def compute_shard(shard: FleetShard) -> ShardMetrics:
+    """Metric values of every store in the shard; a failing store records its exception"""
+    values = np.zeros((len(shard.store_ids), METRIC_COUNT), dtype=np.float64)
+    errors = {}
+    rollup = shard.rollup
+    
+    for i, (run_start, run_end) in enumerate(zip(shard.run_starts.tolist(), shard.run_ends.tolist())):
+        try:
+            if rollup is None:
+                values[i] = compute_metrics(
+                    shard.obs_times[run_start:run_end],
+                    shard.obs_active[run_start:run_end],
+                    shard.hours[i],
+                    shard.timezones[i],
+                    shard.current_time
+                )
+            else:
+                intervals = slice(int(rollup.run_starts[i]), int(rollup.run_ends[i]))
+                values[i] = compute_metrics_from_rollup(
+                    rollup.interval_starts[intervals],
+                    rollup.interval_ends[intervals],
+                    rollup.interval_active[intervals],
+                    shard.obs_times[run_start:run_end],
+                    shard.obs_active[run_start:run_end],
+                    shard.current_time
+                )
+        except Exception as e:
+            errors[i] = e
+    
+    return ShardMetrics(shard.store_ids, values, errors)
+
+def compute_metrics(
+    obs_times: np.ndarray,
+    obs_active: np.ndarray,
+    business_hours: HoursKey,
+    timezone_str: str,
+    current_time: datetime
+) -> MetricValues:
+    # The three windows are nested and share their right edge, so one sweep serves all of them
+    return _metric_values(calculate_windows(
+        obs_times, obs_active, business_hours, timezone_str,
+        report_windows(current_time), current_time
+    ))
+
+def compute_metrics_from_rollup(
+    interval_starts: np.ndarray,
+    interval_ends: np.ndarray,
+    interval_active: np.ndarray,
+    edge_times: np.ndarray,
+    edge_active: np.ndarray,
+    current_time: datetime
+) -> MetricValues:
+    return _metric_values(uptime_rollup.calculate_windows(
+        interval_starts, interval_ends, interval_active, edge_times, edge_active,
+        report_windows(current_time), current_time
+    ))
+
+def report_windows(current_time: datetime) -> List[datetime]:
+    """Starts of the last hour, day and week windows, which all end at ``current_time``"""
+    return [
+        current_time - timedelta(hours=1),
+        current_time - timedelta(days=1),
+        current_time - timedelta(weeks=1)
+    ]
+
+def _metric_values(windows: List[Tuple[float, float]]) -> MetricValues:
+    (
+        (uptime_last_hour_hours, total_hours_last_hour),
+        (uptime_last_day_hours, total_hours_last_day),
+        (uptime_last_week_hours, total_hours_last_week),
+    ) = windows
+    
+    # FIXED: Consistent unit calculations
+    downtime_last_hour_hours = max(0, total_hours_last_hour - uptime_last_hour_hours)
+    downtime_last_day_hours = max(0, total_hours_last_day - uptime_last_day_hours)
+    downtime_last_week_hours = max(0, total_hours_last_week - uptime_last_week_hours)
+    
+    # FIXED: Better rounding to avoid floating point issues
+    return (
+        _safe_round(uptime_last_hour_hours * 60, 2),  # Convert to minutes
+        _safe_round(uptime_last_day_hours, 2),
+        _safe_round(uptime_last_week_hours, 2),
+        _safe_round(downtime_last_hour_hours * 60, 2),  # Convert to minutes
+        _safe_round(downtime_last_day_hours, 2),
+        _safe_round(downtime_last_week_hours, 2)
+    )
+
+def calculate_windows(
+    obs_times: np.ndarray,
+    obs_active: np.ndarray,
+    business_hours: HoursKey,
+    timezone_str: str,
+    window_starts: List[datetime],
+    end_time: datetime
+) -> List[Tuple[float, float]]:
+    """(uptime hours, business hours) for each window [window_start, end_time].
+
+    Business intervals come from the store's compiled UTC calendar and are
+    interpolated once for the widest window. A narrower window reuses every
+    interval that starts inside it and only re-interpolates the single
+    interval its start cuts through, because clipping changes which
+    observation is extended to the start.
+    """
+    starts, ends = business_calendar.compile_calendar(
+        business_hours,
+        timezone_str,
+        to_epoch(min(window_starts)),
+        to_epoch(end_time)
+    )
+    active = uptime_kernel.active_seconds(obs_times, obs_active, starts, ends)
+    
+    results = []
+    for window_start in window_starts:
+        window_epoch = to_epoch(window_start)
+        first = int(np.searchsorted(starts, window_epoch, side='left'))
+        
+        window_active = active[first:].tolist()
+        window_business = (ends[first:] - starts[first:]).tolist()
+        
+        if first > 0 and ends[first - 1] > window_epoch:
+            clipped_end = ends[first - 1:first]
+            clipped_active = uptime_kernel.active_seconds(
+                obs_times, obs_active, np.array([window_epoch]), clipped_end
+            )
+            window_active.insert(0, float(clipped_active[0]))
+            window_business.insert(0, int(clipped_end[0] - window_epoch))
+        
+        # Summed per interval in hours, in order, so rounding matches the per-day loop it replaced
+        results.append((
+            sum(seconds / 3600 for seconds in window_active),
+            sum(seconds / 3600 for seconds in window_business)
+        ))
+    
+    return results
+
+def _safe_round(value: float, decimals: int = 2) -> float:
+    """Round with better floating point handling"""
+    return round(float(value), decimals)
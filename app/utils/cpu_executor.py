@@ -0,0 +1,14 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Kept apart from the loop's default executor so file I/O never queues behind report math
+CPU_EXECUTOR_THREADS = int(os.getenv("CPU_EXECUTOR_THREADS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=CPU_EXECUTOR_THREADS, thread_name_prefix="cpu-bound")
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Run CPU-heavy work off the event loop so API requests keep being served"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
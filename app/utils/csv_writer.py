@@ -1,33 +1,159 @@
 import csv
 import os
 import asyncio
-from typing import List, Dict, Any
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pyarrow = None
+    pq = None
+
+REPORT_FORMATS = ("csv", "parquet")
+# Metrics are rounded to two decimals, so every value is written with exactly two
+FLOAT_FORMAT = "%.2f"
+
+class ReportStream(ABC):
+    """Appends report batches to a temporary file that is moved into place once complete.
+
+    Batches are written as they are produced, so nothing is held in memory
+    beyond the current batch, and readers never see a partial report.
+    """
+
+    def __init__(self, file_path: str, columns: List[str]):
+        self.file_path = file_path
+        # Unique per process, so two processes producing the same report never share a temporary file
+        self.temp_path = f"{file_path}.{os.getpid()}.part"
+        self.columns = columns
+        self.rows_written = 0
+
+    async def open(self):
+        await self._run(self._open_sync)
+
+    async def write_frame(self, frame: pd.DataFrame):
+        """Append a batch of rows with the report's columns"""
+        if len(frame):
+            await self._run(self._write_sync, frame[self.columns])
+            self.rows_written += len(frame)
+
+    async def commit(self) -> str:
+        """Flush the rows and atomically publish the file under its final name"""
+        if not self.rows_written:
+            await self.abort()
+            raise ValueError("No data to write to report")
+
+        await self._run(self._commit_sync)
+        return self.file_path
+
+    async def abort(self):
+        """Drop the partial file"""
+        await self._run(self._abort_sync)
+
+    @abstractmethod
+    def _open_sync(self):
+        """Create the temporary file"""
+
+    @abstractmethod
+    def _write_sync(self, frame: pd.DataFrame):
+        """Append a batch to the temporary file"""
+
+    @abstractmethod
+    def _close_sync(self):
+        """Flush and close the temporary file; called again after it is closed"""
+
+    def _commit_sync(self):
+        self._close_sync()
+        os.replace(self.temp_path, self.file_path)
+
+    def _abort_sync(self):
+        self._close_sync()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    async def _run(self, func, *args):
+        # File I/O runs in the default thread pool to avoid blocking
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, func, *args)
+
+class CsvReportStream(ReportStream):
+
+    def _open_sync(self):
+        self._file = open(self.temp_path, 'w', newline='', encoding='utf-8')
+        csv.writer(self._file, lineterminator='\n').writerow(self.columns)
+
+    def _write_sync(self, frame: pd.DataFrame):
+        # Formatted column by column rather than value by value
+        frame.to_csv(self._file, header=False, index=False, float_format=FLOAT_FORMAT, lineterminator='\n')
+
+    def _close_sync(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+class ParquetReportStream(ReportStream):
+    """Writes each batch as a Parquet row group"""
+
+    def _open_sync(self):
+        self._writer = None
+
+    def _write_sync(self, frame: pd.DataFrame):
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        # The schema comes from the first batch
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.temp_path, table.schema)
+        self._writer.write_table(table)
+
+    def _close_sync(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
 
 class CsvWriter:
-    
+
     def __init__(self):
         self.reports_dir = "reports"
         os.makedirs(self.reports_dir, exist_ok=True)
 
+    def check_format(self, report_format: str):
+        """Raise ValueError for a format that cannot be written here"""
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {report_format}")
+        if report_format == "parquet" and pq is None:
+            raise ValueError("Parquet reports require pyarrow to be installed")
+
+    def report_path(self, report_id: str, report_format: str = "csv") -> str:
+        return os.path.join(self.reports_dir, f"store_report_{report_id}.{report_format}")
+
+    def find_report(self, report_id: str, report_format: str = "csv") -> Optional[str]:
+        """Path of a completed report file, if there is one; partial files are never under this name"""
+        file_path = self.report_path(report_id, report_format)
+        return file_path if os.path.exists(file_path) else None
+
+    async def open_report(self, report_id: str, columns: List[str], report_format: str = "csv") -> ReportStream:
+        """Start a report file that row batches can be streamed into"""
+        self.check_format(report_format)
+
+        file_path = self.report_path(report_id, report_format)
+        stream_class = ParquetReportStream if report_format == "parquet" else CsvReportStream
+        stream = stream_class(file_path, columns)
+        await stream.open()
+        return stream
+
     async def write_report(self, report_id: str, data: List[Dict[str, Any]]) -> str:
         """Write report data to CSV file"""
-        file_path = os.path.join(self.reports_dir, f"store_report_{report_id}.csv")
-        
         if not data:
             raise ValueError("No data to write to CSV")
-        
+
         # Get field names from first row
-        fieldnames = list(data[0].keys())
-        
-        # Write CSV in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._write_csv_sync, file_path, data, fieldnames)
-        
-        return file_path
-    
-    def _write_csv_sync(self, file_path: str, data: List[Dict[str, Any]], fieldnames: List[str]):
-        """Synchronous CSV writing"""
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
\ No newline at end of file
+        stream = await self.open_report(report_id, list(data[0].keys()))
+        try:
+            await stream.write_frame(pd.DataFrame(data))
+            return await stream.commit()
+        except Exception:
+            await stream.abort()
+            raise
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+import pandas as pd
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+
+def to_epoch(value: datetime) -> int:
+    """Naive-UTC or aware datetime to whole epoch seconds (sub-second part is dropped)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((value - UNIX_EPOCH).total_seconds() // 1)
+
+def from_epoch(seconds: int) -> datetime:
+    """Epoch seconds to the naive UTC datetime used throughout the services"""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+def series_to_epoch(values: pd.Series) -> pd.Series:
+    """Vectorized naive-UTC datetime column to int64 epoch seconds"""
+    return (values - pd.Timestamp(UNIX_EPOCH)) // pd.Timedelta(seconds=1)
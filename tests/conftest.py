@@ -0,0 +1,37 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# The engine is created on import, so the test database has to be chosen first
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+from app.config.database import Base, engine
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop, releasing pooled connections afterwards"""
+    def _run(coro):
+        async def wrapper():
+            try:
+                return await coro
+            finally:
+                await engine.dispose()
+        return asyncio.run(wrapper())
+    return _run
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch, run):
+    """An empty database and a working directory with a data/ folder for the source CSVs"""
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+    
+    run(reset())
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
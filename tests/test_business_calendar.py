@@ -0,0 +1,97 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytz
+
+from app.models.business_hours import BusinessHours
+from app.services.business_calendar import ALWAYS_OPEN, compile_calendar, hours_key
+
+ZONES = ("America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kolkata", "UTC")
+
+def _epoch(store_tz, local_date: date, local_time: time) -> int:
+    return int(store_tz.localize(datetime.combine(local_date, local_time)).timestamp())
+
+def _reference_calendar(hours, timezone_str, start_epoch, end_epoch):
+    """Localize every date's midnights and hours separately, with no caching or offset shortcuts"""
+    store_tz = pytz.timezone(timezone_str)
+    hours_by_day = {day: (start, end) for day, start, end in hours}
+    local_date = datetime.fromtimestamp(start_epoch, pytz.UTC).astimezone(store_tz).date() - timedelta(days=2)
+    last_date = datetime.fromtimestamp(end_epoch, pytz.UTC).astimezone(store_tz).date() + timedelta(days=1)
+    
+    intervals = []
+    while local_date <= last_date:
+        if local_date.weekday() in hours_by_day:
+            start_time, end_time = hours_by_day[local_date.weekday()]
+            midnight = _epoch(store_tz, local_date, time.min)
+            next_midnight = _epoch(store_tz, local_date + timedelta(days=1), time.min)
+            interval_start = max(_epoch(store_tz, local_date, start_time), midnight)
+            if end_time <= start_time:
+                interval_end = next_midnight
+            else:
+                interval_end = min(_epoch(store_tz, local_date, end_time), next_midnight)
+            
+            interval_start, interval_end = max(interval_start, start_epoch), min(interval_end, end_epoch)
+            if interval_start < interval_end:
+                intervals.append((interval_start, interval_end))
+        local_date += timedelta(days=1)
+    
+    return sorted(intervals)
+
+def _random_hours(rng):
+    hours = []
+    for day in range(7):
+        if rng.random() < 0.2:
+            continue
+        # Whole and half hours, including 02:30 inside a spring-forward gap and overnight shifts
+        start, end = (time(rng.randrange(24), rng.choice((0, 30))) for _ in range(2))
+        hours.append((day, start, end))
+    return tuple(hours)
+
+def test_matches_per_date_localization_across_dst_changes():
+    rng = random.Random(15)
+    # Spans the 2023 DST changes in both hemispheres
+    span_start = int(datetime(2023, 3, 1, tzinfo=pytz.UTC).timestamp())
+    span_end = int(datetime(2023, 11, 15, tzinfo=pytz.UTC).timestamp())
+    
+    for _ in range(300):
+        hours = _random_hours(rng)
+        timezone_str = rng.choice(ZONES)
+        start_epoch = rng.randrange(span_start, span_end)
+        end_epoch = start_epoch + rng.randrange(3600, 10 * 24 * 3600)
+        
+        starts, ends = compile_calendar(hours, timezone_str, start_epoch, end_epoch)
+        
+        assert list(zip(starts.tolist(), ends.tolist())) == _reference_calendar(
+            hours, timezone_str, start_epoch, end_epoch
+        )
+
+def test_spring_forward_day_keeps_local_opening_times():
+    hours = tuple((day, time(9), time(17)) for day in range(7))
+    store_tz = pytz.timezone("America/New_York")
+    day_start = _epoch(store_tz, date(2023, 3, 12), time.min)
+    
+    starts, ends = compile_calendar(hours, "America/New_York", day_start, day_start + 23 * 3600)
+    
+    # 09:00 EDT is 13:00 UTC, an hour earlier in UTC than on the day before
+    assert starts.tolist() == [int(datetime(2023, 3, 12, 13, tzinfo=pytz.UTC).timestamp())]
+    assert (ends - starts).tolist() == [8 * 3600]
+
+def test_overnight_hours_end_at_local_midnight():
+    hours = ((0, time(22), time(6)),)
+    monday = _epoch(pytz.UTC, date(2023, 1, 23), time.min)
+    
+    starts, ends = compile_calendar(hours, "UTC", monday, monday + 7 * 24 * 3600)
+    
+    assert starts.tolist() == [monday + 22 * 3600]
+    assert ends.tolist() == [monday + 24 * 3600]
+
+def test_always_open_and_first_row_per_weekday():
+    rows = [
+        BusinessHours(day_of_week=1, start_time_local=time(8), end_time_local=time(12)),
+        BusinessHours(day_of_week=1, start_time_local=time(13), end_time_local=time(18)),
+    ]
+    assert hours_key(rows) == ((1, time(8), time(12)),)
+    
+    starts, ends = compile_calendar(ALWAYS_OPEN, "UTC", 0, 3 * 24 * 3600)
+    assert np.all(ends - starts == 24 * 3600 - 1)
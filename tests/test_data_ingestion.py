@@ -0,0 +1,122 @@
+import os
+from datetime import datetime
+
+from app.config.database import AsyncSessionLocal
+from app.models.business_hours import BusinessHours
+from app.models.data_generation import DataGeneration
+from app.models.ingestion_watermark import IngestionWatermark
+from app.models.store import Store
+from app.models.store_status import StoreStatus
+from app.models.store_timezone import StoreTimezone
+from app.repositories.generation_repository import GenerationRepository
+from app.services.data_ingestion_service import DataIngestionService
+from app.utils.csv_reader import CONTENT_HASH_BLOCK_BYTES, CsvReader
+from sqlalchemy import func, select
+
+MENU_HOURS = "store_id,dayOfWeek,start_time_local,end_time_local\ns1,0,09:00:00,17:00:00\n"
+TIMEZONES = "store_id,timezone_str\ns1,America/New_York\n"
+
+async def _published_tables():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(DataGeneration.table_name))
+        return set(result.scalars().all())
+
+async def _count(model):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(func.count()).select_from(model))
+        return result.scalar()
+
+async def _snapshot():
+    async with AsyncSessionLocal() as session:
+        return await GenerationRepository().get_snapshot(session)
+
+async def _watermark(source):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(IngestionWatermark).where(IngestionWatermark.source == source))
+        return result.scalar_one()
+
+def test_header_only_status_file_still_publishes_config(workdir, run):
+    (workdir / "data" / "store_status.csv").write_text("store_id,status,timestamp_utc\n")
+    (workdir / "data" / "menu_hours.csv").write_text(MENU_HOURS)
+    (workdir / "data" / "timezones.csv").write_text(TIMEZONES)
+    
+    run(DataIngestionService().load_all_data())
+    
+    assert {"store_status", "business_hours", "store_timezone"} <= run(_published_tables())
+    assert run(_count(BusinessHours)) == 1
+    assert run(_count(StoreTimezone)) == 1
+
+STATUS_HEADER = "store_id,status,timestamp_utc\n"
+STATUS_ROW = "s1,active,2023-01-25 12:{minute:02d}:00.000000 UTC\n"
+
+def test_empty_config_files_are_skipped(workdir, run):
+    (workdir / "data" / "store_status.csv").write_text(STATUS_HEADER + STATUS_ROW.format(minute=0))
+    (workdir / "data" / "menu_hours.csv").write_text("")
+    (workdir / "data" / "timezones.csv").write_text("")
+    
+    run(DataIngestionService().load_all_data())
+    
+    assert "store_status" in run(_published_tables())
+    assert run(_count(BusinessHours)) == 0
+
+def test_duplicate_timezones_are_quarantined(workdir, run):
+    (workdir / "data" / "store_status.csv").write_text(STATUS_HEADER + STATUS_ROW.format(minute=0))
+    # Rows 1-2 and 3 land in different chunks
+    (workdir / "data" / "timezones.csv").write_text(
+        "store_id,timezone_str\n"
+        "s1,America/New_York\n"
+        "s1,America/Chicago\n"
+        "s1,Asia/Kolkata\n"
+        "s2,Asia/Kolkata\n"
+    )
+    
+    run(DataIngestionService(chunk_size=2).load_all_data())
+    
+    assert {"store_status", "store_timezone"} <= run(_published_tables())
+    assert run(_count(StoreTimezone)) == 2
+    with open(os.path.join("data", "quarantine", "store_timezone_rejected.csv")) as rejected:
+        assert rejected.read().count("duplicate store_id") == 2
+
+def test_append_extends_the_content_hash(workdir, run, monkeypatch):
+    status_file = workdir / "data" / "store_status.csv"
+    status_file.write_text(STATUS_HEADER + STATUS_ROW.format(minute=0))
+    run(DataIngestionService().load_all_data())
+    
+    with open(status_file, "a") as handle:
+        handle.write(STATUS_ROW.format(minute=30))
+    
+    service = DataIngestionService()
+    hashed = []
+    original = service.csv_reader.content_hash
+    monkeypatch.setattr(service.csv_reader, "content_hash", lambda *args: hashed.append(args) or original(*args))
+    run(service.load_all_data())
+    
+    assert hashed == []
+    assert run(_count(StoreStatus)) == 2
+    assert run(_snapshot()).window(StoreStatus).max_timestamp == datetime(2023, 1, 25, 12, 30)
+    watermark = run(_watermark("store_status"))
+    assert watermark.content_hash == original(str(status_file), os.path.getsize(status_file))
+    
+    # Touched without changing: recognised by its full hash
+    os.utime(status_file, (0, 0))
+    run(service.load_all_data())
+    assert len(hashed) == 1
+    assert run(_count(Store)) == 1
+    
+    # Rewritten in place to the same size: reloaded even though the sampled fingerprint is unchanged
+    monkeypatch.setattr(service.csv_reader, "fingerprint", lambda *args: watermark.fingerprint)
+    status_file.write_text(STATUS_HEADER + STATUS_ROW.format(minute=0).replace("s1", "s2") + STATUS_ROW.format(minute=30))
+    os.utime(status_file, (1, 1))
+    run(service.load_all_data())
+    assert run(_count(Store)) == 2
+
+def test_extended_content_hash_equals_the_full_hash(tmp_path):
+    reader = CsvReader()
+    path = tmp_path / "blocks.bin"
+    path.write_bytes(bytes(range(256)) * 10000)
+    size = os.path.getsize(path)
+    
+    for start in (0, 1000, CONTENT_HASH_BLOCK_BYTES, CONTENT_HASH_BLOCK_BYTES + 7, size):
+        prefix = reader.content_hash(str(path), start)
+        assert reader.extend_content_hash(str(path), prefix, start, size) == reader.content_hash(str(path), size)
+    assert reader.content_hash(str(path), size - 1) != reader.content_hash(str(path), size)
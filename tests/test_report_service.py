@@ -0,0 +1,88 @@
+import asyncio
+
+from app.config.database import Base, engine
+from app.services.data_ingestion_service import DataIngestionService
+from app.models.report import ReportStatus
+from app.services.report_service import ReportService
+
+STATUS = (
+    "store_id,status,timestamp_utc\n"
+    "s1,active,2023-01-25 12:00:00.000000 UTC\n"
+    "s1,inactive,2023-01-25 13:30:00.000000 UTC\n"
+)
+
+async def _wait_for(service: ReportService, report_id: str, timeout: float = 10) -> dict:
+    for _ in range(int(timeout / 0.01)):
+        status = await service.get_report_status(report_id)
+        if status["status"] != ReportStatus.RUNNING:
+            return status
+        await asyncio.sleep(0.01)
+    return status
+
+def test_cancelled_job_does_not_capture_later_triggers(workdir, run):
+    (workdir / "data" / "store_status.csv").write_text(STATUS)
+    run(DataIngestionService().load_all_data())
+    
+    async def scenario():
+        service = ReportService()
+        await service.trigger_report()
+        for task in list(service._tasks):
+            task.cancel()
+        await asyncio.gather(*service._tasks, return_exceptions=True)
+        assert service._jobs == {}
+        
+        report_id = await service.trigger_report()
+        return await _wait_for(service, report_id)
+    
+    assert run(scenario())["status"] == "Complete"
+
+def test_waiters_fail_when_completing_them_fails(workdir, run, monkeypatch):
+    (workdir / "data" / "store_status.csv").write_text(STATUS)
+    run(DataIngestionService().load_all_data())
+    
+    service = ReportService()
+    update_status = service._update_report_status
+    
+    async def flaky_update(report_ids, status, *args, **kwargs):
+        if status == ReportStatus.COMPLETE:
+            raise RuntimeError("database is locked")
+        await update_status(report_ids, status, *args, **kwargs)
+    
+    monkeypatch.setattr(service, "_update_report_status", flaky_update)
+    
+    async def scenario():
+        report_ids = [await service.trigger_report(), await service.trigger_report()]
+        return [await _wait_for(service, report_id) for report_id in report_ids]
+    
+    for status in run(scenario()):
+        assert status == {"status": ReportStatus.FAILED, "error": "database is locked"}
+
+def test_recreated_database_does_not_reuse_reports(workdir, run):
+    status_file = workdir / "data" / "store_status.csv"
+    status_file.write_text(STATUS)
+    run(DataIngestionService().load_all_data())
+    
+    async def report():
+        service = ReportService()
+        status = await _wait_for(service, await service.trigger_report())
+        with open(status["file_path"]) as report_file:
+            return report_file.read()
+    
+    first = run(report())
+    
+    # Same generations and latest observation, different data
+    async def recreate():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+    
+    run(recreate())
+    status_file.write_text(
+        "store_id,status,timestamp_utc\n"
+        "s1,inactive,2023-01-25 12:00:00.000000 UTC\n"
+        "s1,active,2023-01-25 13:30:00.000000 UTC\n"
+    )
+    run(DataIngestionService().load_all_data())
+    
+    second = run(report())
+    assert second != first
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.controllers.uptime_controller import get_uptime
+from app.services.data_ingestion_service import DataIngestionService
+
+STATUS = (
+    "store_id,status,timestamp_utc\n"
+    "s1,active,2023-01-25 12:00:00.000000 UTC\n"
+    "s1,inactive,2023-01-25 13:30:00.000000 UTC\n"
+)
+
+def test_range_outside_the_data_is_not_found(workdir, run):
+    (workdir / "data" / "store_status.csv").write_text(STATUS)
+    run(DataIngestionService().load_all_data())
+    
+    uptime = run(get_uptime("s1", datetime(2023, 1, 25, 11), datetime(2023, 1, 25, 13)))
+    assert uptime["start"] == "2023-01-25T12:00:00"
+    assert uptime["business_hours"] == 1.0
+    
+    for start, end in ((datetime(2023, 1, 20), datetime(2023, 1, 21)), (datetime(2023, 1, 26), datetime(2023, 1, 27))):
+        with pytest.raises(HTTPException) as error:
+            run(get_uptime("s1", start, end))
+        assert error.value.status_code == 404
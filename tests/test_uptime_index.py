@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+
+from app.services.uptime_index import build_index
+
+def _status_at(moment, times, active, start, end):
+    """Status at one second of a business interval, as the index interpolates it"""
+    inside = [(t, a) for t, a in zip(times, active) if start <= t <= end]
+    if not inside:
+        return True
+    held = [a for t, a in inside if t <= moment]
+    return held[-1] if held else inside[0][1]
+
+def _brute_force(times, active, starts, ends, query_start, query_end):
+    business = 0
+    uptime = 0
+    for start, end in zip(starts, ends):
+        for moment in range(max(start, query_start), min(end, query_end)):
+            business += 1
+            uptime += _status_at(moment, times, active, start, end)
+    return business, uptime
+
+def test_queries_match_per_second_interpolation():
+    rng = random.Random(20)
+    for _ in range(200):
+        bounds = sorted(rng.sample(range(0, 600), 2 * rng.randrange(0, 6)))
+        starts, ends = bounds[0::2], bounds[1::2]
+        times = sorted(set(rng.randrange(0, 600) for _ in range(rng.randrange(0, 25))))
+        active = [rng.random() < 0.6 for _ in times]
+        
+        index = build_index(
+            np.array(times, dtype=np.int64), np.array(active, dtype=bool),
+            np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+        )
+        
+        for _ in range(10):
+            query_start, query_end = sorted(rng.sample(range(-20, 620), 2))
+            business, uptime = index.query(query_start, query_end)
+            assert (business, uptime) == _brute_force(times, active, starts, ends, query_start, query_end)
+
+def test_empty_index_reports_nothing():
+    empty = np.empty(0, dtype=np.int64)
+    index = build_index(empty, empty.astype(bool), empty, empty)
+    assert index.query(0, 100) == (0, 0.0)
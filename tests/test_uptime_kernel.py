@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+from app.services.uptime_kernel import active_seconds
+
+def _interpolate_uptime(times, active, start, end):
+    """Active seconds of one interval as the original per-observation loop computed them"""
+    observations = [(t, a) for t, a in zip(times, active) if start <= t <= end]
+    if not observations:
+        return end - start
+    
+    extended = list(observations)
+    if observations[0][0] > start:
+        extended.insert(0, (start, observations[0][1]))
+    if observations[-1][0] < end:
+        extended.append((end, observations[-1][1]))
+    
+    uptime = 0
+    for (current, status), (following, _) in zip(extended, extended[1:]):
+        segment_start = max(current, start)
+        segment_end = min(following, end)
+        if segment_start < segment_end and status:
+            uptime += segment_end - segment_start
+    return uptime
+
+def test_matches_per_observation_interpolation():
+    rng = random.Random(12)
+    for _ in range(500):
+        times = sorted(rng.randrange(0, 1000) for _ in range(rng.randrange(0, 30)))
+        active = [rng.random() < 0.7 for _ in times]
+        bounds = sorted(rng.sample(range(-50, 1050), 2 * rng.randrange(1, 8)))
+        starts, ends = bounds[0::2], bounds[1::2]
+        
+        result = active_seconds(
+            np.array(times, dtype=np.int64), np.array(active, dtype=bool),
+            np.array(starts), np.array(ends)
+        )
+        
+        expected = [_interpolate_uptime(times, active, start, end) for start, end in zip(starts, ends)]
+        np.testing.assert_array_equal(result, expected)
+
+def test_interval_without_observations_counts_as_active():
+    result = active_seconds(np.array([10, 20]), np.array([False, False]), np.array([100]), np.array([160]))
+    np.testing.assert_array_equal(result, [60])
+
+def test_observations_on_the_boundaries_belong_to_the_interval():
+    # Inactive at the start, active exactly at the end: only the zero-length tail is active
+    result = active_seconds(np.array([100, 160]), np.array([False, True]), np.array([100]), np.array([160]))
+    np.testing.assert_array_equal(result, [0])
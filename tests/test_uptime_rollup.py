@@ -0,0 +1,115 @@
+import random
+from dataclasses import replace
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from app.config.database import AsyncSessionLocal
+from app.models.store_status import StoreStatus
+from app.models.uptime_rollup import UptimeRollup
+from app.repositories.generation_repository import GenerationRepository
+from app.services import uptime_rollup, uptime_shard
+from app.services.data_ingestion_service import DataIngestionService
+from app.services.uptime_calculation_service import UptimeCalculationService
+from app.utils.epoch import from_epoch, to_epoch
+from sqlalchemy import func, select
+
+STATUS_HEADER = "store_id,status,timestamp_utc\n"
+MENU_HOURS = (
+    "store_id,dayOfWeek,start_time_local,end_time_local\n"
+    + "".join(f"s0,{day},09:00:00,17:00:00\n" for day in range(7))
+    + "".join(f"s1,{day},20:00:00,02:00:00\n" for day in range(7))
+)
+TIMEZONES = "store_id,timezone_str\ns0,America/New_York\ns1,Asia/Kolkata\ns2,America/Chicago\n"
+
+def _status_rows(start: datetime, hours: int, seed: int) -> str:
+    rng = random.Random(seed)
+    rows = []
+    for hour in range(hours):
+        for store in ("s0", "s1", "s2"):
+            moment = start + timedelta(hours=hour, minutes=rng.randrange(60))
+            status = "active" if rng.random() < 0.8 else "inactive"
+            rows.append(f"{store},{status},{moment:%Y-%m-%d %H:%M:%S}.000000 UTC\n")
+    return "".join(rows)
+
+async def _duplicate_generations():
+    """Generations holding each (store, interval) that is stored more than once"""
+    async with AsyncSessionLocal() as session:
+        stmt = select(UptimeRollup.store_id, UptimeRollup.interval_start, UptimeRollup.generation)
+        rows = (await session.execute(stmt)).all()
+    
+    copies = {}
+    for store_id, interval_start, generation in rows:
+        copies.setdefault((store_id, interval_start), []).append(generation)
+    return [sorted(generations) for generations in copies.values() if len(generations) > 1]
+
+async def _fleet_metrics(use_rollup: bool) -> np.ndarray:
+    """Metric values of every store, from the rollup or from raw observations only"""
+    service = UptimeCalculationService()
+    service.workers = 1
+    async with AsyncSessionLocal() as session:
+        snapshot = await GenerationRepository().get_snapshot(session)
+        if not use_rollup:
+            # Without a published rollup window the report falls back to the raw observations
+            snapshot = replace(snapshot, windows={
+                name: window for name, window in snapshot.windows.items()
+                if name != UptimeRollup.__tablename__
+            })
+        
+        stmt = select(func.max(StoreStatus.timestamp_utc)).where(snapshot.visible(StoreStatus))
+        current_time = from_epoch((await session.execute(stmt)).scalar())
+        store_ids = (await session.execute(select(StoreStatus.store_id).distinct())).scalars().all()
+    
+    values = []
+    async for shard in service.iter_fleet_metrics(sorted(store_ids), current_time, snapshot):
+        assert not shard.errors
+        values.append(shard.values)
+    return np.concatenate(values)
+
+def test_appends_prune_superseded_rollup_rows_and_match_raw_metrics(workdir, run):
+    (workdir / "data" / "menu_hours.csv").write_text(MENU_HOURS)
+    (workdir / "data" / "timezones.csv").write_text(TIMEZONES)
+    status_file = workdir / "data" / "store_status.csv"
+    status_file.write_text(STATUS_HEADER + _status_rows(datetime(2023, 1, 18), 24 * 6, seed=0))
+    run(DataIngestionService().load_all_data())
+    
+    for part in range(1, 6):
+        with open(status_file, "a") as handle:
+            handle.write(_status_rows(datetime(2023, 1, 24) + timedelta(hours=6 * (part - 1)), 6, seed=part))
+        run(DataIngestionService().load_all_data())
+        
+        # Only the latest append's copies may still shadow a single older one
+        for generations in run(_duplicate_generations()):
+            assert len(generations) == 2
+    
+    np.testing.assert_array_equal(run(_fleet_metrics(use_rollup=True)), run(_fleet_metrics(use_rollup=False)))
+
+def test_windows_from_rollup_match_raw_windows():
+    rng = random.Random(19)
+    for _ in range(100):
+        hours = tuple(
+            (day, time(rng.randrange(24), rng.choice((0, 30))), time(rng.randrange(24), rng.choice((0, 30))))
+            for day in range(7) if rng.random() < 0.8
+        )
+        timezone_str = rng.choice(("America/New_York", "Asia/Kolkata", "Europe/London"))
+        current_time = datetime(2023, 3, 20) + timedelta(seconds=rng.randrange(14 * 24 * 3600))
+        end = to_epoch(current_time)
+        obs_times = np.unique(np.array(
+            [rng.randrange(end - 9 * 24 * 3600, end + 1) for _ in range(rng.randrange(0, 400))], dtype=np.int64
+        ))
+        obs_active = np.array([rng.random() < 0.7 for _ in obs_times], dtype=bool)
+        windows = uptime_shard.report_windows(current_time)
+        week_start = to_epoch(windows[-1])
+        
+        starts, ends, active, _ = uptime_rollup.rollup_store(
+            obs_times, obs_active, hours, timezone_str, week_start, end
+        )
+        # As read back for a report: intervals overlapping the week
+        overlapping = (ends > week_start) & (starts < end)
+        
+        from_rollup = uptime_rollup.calculate_windows(
+            starts[overlapping], ends[overlapping], active[overlapping],
+            obs_times, obs_active, windows, current_time
+        )
+        raw = uptime_shard.calculate_windows(obs_times, obs_active, hours, timezone_str, windows, current_time)
+        assert from_rollup == raw